@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Benchmark the lesson scripts against a synthetic corpus.
+
+Generates lessons shaped like content/course (see lesson_tools.synthetic) at the
+chosen scale, times the hot functions on inputs taken from that corpus, then
+times the stages over one lesson with a very large section (where an edit
+costing more than its own lines shows up at once), then times each script's
+end-to-end run on a fresh copy of the corpus. Throughput is
+reported in items/s and MB/s; --json saves the results and --baseline compares
+against a previous run so regressions are visible.
+"""
+
+import argparse
+import inspect
+import json
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+from lesson_tools import LessonDocument, memo
+from lesson_tools.runner import render_lesson
+from lesson_tools.stages import SCRIPTS_DIR, STAGES, load_script
+from lesson_tools.synthetic import WORDS, generate_corpus, lesson_files
+
+SCALES = {'300': 300, '10k': 10_000, '100k': 100_000}
+SECTIONS = ["What You'll Learn", "Key Takeaways"]
+LARGE_SECTION_BULLETS = 32_000
+LARGE_SECTION_STAGES = ['lowercase', 'refine', 'case']
+END_TO_END_SCRIPTS = [
+    'convert-bullet-lists',
+    'refine-long-bullets',
+    'fix-bullet-case-proper',
+    'normalize-lessons',
+]
+
+
+@dataclass
+class Result:
+    name: str
+    unit: str
+    items: int
+    bytes: int
+    seconds: float
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.seconds if self.seconds else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / self.seconds / 1_000_000 if self.seconds else 0.0
+
+
+def best_of(repeat: int, run: Callable[[], None]) -> float:
+    """Return the fastest of `repeat` timed runs, each starting with empty transform caches."""
+    best = float('inf')
+    for _ in range(repeat):
+        memo.clear()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_each(name: str, unit: str, fn: Callable[[str], object], inputs: Sequence[str], repeat: int) -> Result:
+    """Time fn over every input; throughput is measured over the input text.
+
+    A memoized function is timed unwrapped (see time_cached for the cache),
+    so inputs repeated within a run still measure the transform itself and
+    split_long_bullet_optimal compares with split_long_bullet like for like.
+    """
+    fn = inspect.unwrap(fn)
+
+    def run():
+        for item in inputs:
+            fn(item)
+
+    size = sum(len(item.encode('utf-8')) for item in inputs)
+    return Result(name, unit, len(inputs), size, best_of(repeat, run))
+
+
+def time_cached(name: str, unit: str, fn: Callable[[str], object], inputs: Sequence[str], repeat: int) -> Result:
+    """Time a memo.cached function with its in-process cache already holding every input."""
+    inputs = inputs[-memo.LRU_SIZE:]  # as many as the cache holds
+
+    def run():
+        for item in inputs:
+            fn(item)
+
+    def warm_run():
+        run()  # fill the cache, untimed
+        start = time.perf_counter()
+        run()
+        return time.perf_counter() - start
+
+    size = sum(len(item.encode('utf-8')) for item in inputs)
+    return Result(f"{name} (cached)", unit, len(inputs), size, min(warm_run() for _ in range(repeat)))
+
+
+def function_benchmarks(files: List[Path], repeat: int) -> List[Result]:
+    convert = load_script('convert-bullet-lists')
+    refine = load_script('refine-long-bullets')
+    proper = load_script('fix-bullet-case-proper')
+
+    contents = [path.read_text(encoding='utf-8') for path in files]
+    paragraphs = []
+    long_bullets = []
+    for content in contents:
+        for section in SECTIONS:
+            text, _, _ = convert.extract_section_content(content, section)
+            if text is None:
+                continue
+            if convert.is_bullet_list(text):
+                long_bullets.extend(
+                    line.strip() for line in text.split('\n')
+                    if line.startswith('- ') and len(line.strip()) > refine.MAX_BULLET_LENGTH + 2
+                )
+            else:
+                paragraphs.append(text)
+
+    return [
+        time_each('paragraph_to_bullets', 'paragraphs', convert.paragraph_to_bullets, paragraphs, repeat),
+        time_each('split_long_bullet', 'bullets', refine.split_long_bullet, long_bullets, repeat),
+        time_each('split_long_bullet_optimal', 'bullets', refine.split_long_bullet_optimal, long_bullets, repeat),
+        time_cached('paragraph_to_bullets', 'paragraphs', convert.paragraph_to_bullets, paragraphs, repeat),
+        time_cached('split_long_bullet', 'bullets', refine.split_long_bullet, long_bullets, repeat),
+        time_each('fix_bullet_case_and_remove_duplicates', 'files',
+                  proper.fix_bullet_case_and_remove_duplicates, contents, repeat),
+        time_each('extract_section_content', 'files',
+                  lambda content: [convert.extract_section_content(content, s) for s in SECTIONS], contents, repeat),
+    ]
+
+
+def large_section_lesson(bullets: int, seed: int) -> str:
+    """A lesson whose Key Takeaways holds `bullets` bullets, a quarter of them over the length limit."""
+    rng = random.Random(seed)
+    lines = ['# Large section', '', '## Key Takeaways', '']
+    for i in range(bullets):
+        words = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 12)))
+        if i % 4 == 0:
+            words = f"{words}, and {' '.join(rng.choice(WORDS) for _ in range(12))}; {words}"
+        lines.append(f"- {words.capitalize() if rng.random() < 0.5 else words}")
+    return '\n'.join(lines) + '\n'
+
+
+def large_section_benchmarks(bullets: int, seed: int, repeat: int) -> List[Result]:
+    """Time each stage over one lesson, as the runner would: parse, transform, render."""
+    text = large_section_lesson(bullets, seed)
+    data = text.encode('utf-8')
+    results = []
+    for name in LARGE_SECTION_STAGES:
+        stage = STAGES[name]
+
+        def run():
+            doc = LessonDocument(text)
+            stage.apply(doc)
+            render_lesson(data, text, doc)
+
+        results.append(Result(f"{name} (one {bullets}-bullet section)", 'bullets', bullets, len(data),
+                              best_of(repeat, run)))
+    return results
+
+
+def end_to_end_benchmarks(pristine: Path, work_root: Path, files: int, size: int,
+                          extra_args: List[str]) -> List[Result]:
+    results = []
+    for script in END_TO_END_SCRIPTS:
+        workdir = work_root / script
+        shutil.copytree(pristine, workdir)
+        command = [sys.executable, str(SCRIPTS_DIR / f"{script}.py"), *extra_args]
+        start = time.perf_counter()
+        subprocess.run(command, cwd=workdir, stdout=subprocess.DEVNULL, check=True)
+        seconds = time.perf_counter() - start
+        results.append(Result(f"{script} (end to end)", 'files', files, size, seconds))
+        shutil.rmtree(workdir)
+    return results
+
+
+def load_baseline(path: Optional[Path]) -> dict:
+    if path is None:
+        return {}
+    data = json.loads(path.read_text(encoding='utf-8'))
+    return {result['name']: result for result in data['results']}
+
+
+def print_report(results: List[Result], baseline: dict) -> None:
+    print(f"\n{'benchmark':<48} {'items':>8} {'seconds':>9} {'items/s':>11} {'MB/s':>8}"
+          + ("  vs baseline" if baseline else ""))
+    for result in results:
+        line = (f"{result.name:<48} {result.items:>8} {result.seconds:>9.3f} "
+                f"{result.items_per_second:>11.1f} {result.mb_per_second:>8.2f}")
+        previous = baseline.get(result.name)
+        if previous and previous['seconds'] and result.items == previous['items']:
+            change = previous['seconds'] / result.seconds - 1 if result.seconds else 0.0
+            line += f"  {change:+.1%}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='300', help="corpus size (default: 300)")
+    parser.add_argument('--files', type=int, help="exact number of lessons (overrides --scale)")
+    parser.add_argument('--seed', type=int, default=0, help="corpus seed (default: 0)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per function benchmark, best is kept (default: 3)")
+    parser.add_argument('--jobs', type=int, default=1, help="--jobs passed to the end-to-end runs (default: 1)")
+    parser.add_argument('--section-bullets', type=int, default=LARGE_SECTION_BULLETS, metavar='N',
+                        help=f"bullets in the large-section lesson, 0 to skip it (default: {LARGE_SECTION_BULLETS})")
+    parser.add_argument('--skip-end-to-end', action='store_true', help="only time the functions")
+    parser.add_argument('--keep', type=Path, metavar='DIR', help="generate the corpus in DIR and keep it")
+    parser.add_argument('--json', type=Path, metavar='PATH', help="write the results as JSON")
+    parser.add_argument('--baseline', type=Path, metavar='PATH',
+                        help="a previous --json file; prints the throughput change per benchmark")
+    args = parser.parse_args()
+
+    count = args.files if args.files is not None else SCALES[args.scale]
+    with tempfile.TemporaryDirectory(prefix='lesson-bench-') as tmp:
+        root = args.keep or Path(tmp) / 'corpus'
+        content_dir = root / 'content' / 'course'
+        print(f"Generating {count} lessons in {content_dir}")
+        start = time.perf_counter()
+        stats = generate_corpus(content_dir, count, args.seed)
+        print(f"Generated {stats.files} lessons, {stats.bytes / 1_000_000:.1f} MB "
+              f"in {time.perf_counter() - start:.1f}s")
+
+        files = lesson_files(content_dir)
+        results = function_benchmarks(files, args.repeat)
+        if args.section_bullets:
+            results += large_section_benchmarks(args.section_bullets, args.seed, args.repeat)
+        if not args.skip_end_to_end:
+            extra_args = ['--jobs', str(args.jobs)] if args.jobs != 1 else []
+            results += end_to_end_benchmarks(root, Path(tmp) / 'runs', stats.files, stats.bytes, extra_args)
+
+    print_report(results, load_baseline(args.baseline))
+
+    if args.json:
+        report = {
+            'files': stats.files,
+            'bytes': stats.bytes,
+            'seed': args.seed,
+            'python': platform.python_version(),
+            'results': [
+                {**asdict(result), 'items_per_second': result.items_per_second, 'mb_per_second': result.mb_per_second}
+                for result in results
+            ],
+        }
+        args.json.write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
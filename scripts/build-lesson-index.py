@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Build a prebuilt index of the course for search and lesson pages.
+
+Walks content/course once and writes one compact JSON file holding, per
+lesson, its metadata (path, title, track, platform, module, estimatedTime),
+the Quick Summary, the '##'/'###' outline and the "What You'll Learn" and
+"Key Takeaways" outcomes, plus an inverted index from search terms to the
+lessons that contain them. Term scores weight where a term appears (title,
+then headings, then summary and outcomes; lesson body text only with --body),
+and each term's postings are sorted best first, so the app can answer a search
+from memory without parsing markdown.
+
+Output format:
+
+  {"version": 1,
+   "lessons": [{"path": ..., "title": ..., "outline": [[level, title], ...],
+                "outcomes": {"whatYoullLearn": [...], "keyTakeaways": [...]}, ...}],
+   "terms": {"term": [[lesson_index, score], ...]}}
+"""
+
+import argparse
+import json
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from lesson_tools import LessonDocument
+from lesson_tools.runner import add_selection_arguments, decode_lesson, file_filter
+from lesson_tools.walk import LESSONS, walk_markdown
+
+CONTENT_DIR = Path("content/course")
+DEFAULT_OUTPUT = Path("content/lesson-index.json")
+INDEX_VERSION = 1
+
+TRACKS = {
+    '00-introduction': 'introduction',
+    'design-track': 'design',
+    'engineering-track': 'engineering',
+    'convergence': 'convergence',
+}
+OUTCOME_SECTIONS = {"What You'll Learn": 'whatYoullLearn', "Key Takeaways": 'keyTakeaways'}
+
+# Term weight per field
+WEIGHTS = {'title': 8, 'outline': 3, 'summary': 2, 'outcomes': 2, 'body': 1}
+TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = set(
+    "a an and are as at be but by can do for from has have how if in into is it its of on or so "
+    "than that the their them then there these they this to was we what when where which while "
+    "who why will with you your".split()
+)
+MIN_TERM_LENGTH = 2
+
+
+def tokens(text: str) -> List[str]:
+    return [
+        token for token in TOKEN.findall(text.lower())
+        if len(token) >= MIN_TERM_LENGTH and token not in STOPWORDS
+    ]
+
+
+def read_frontmatter(doc: LessonDocument) -> Dict[str, str]:
+    """Simple `key: value` pairs from the frontmatter block."""
+    if doc.frontmatter is None:
+        return {}
+    fields = {}
+    for line in doc.lines[1:doc.frontmatter[1] - 1]:
+        key, sep, value = line.partition(':')
+        if sep and key.strip():
+            fields[key.strip()] = value.strip().strip('"\'')
+    return fields
+
+
+def lesson_title(doc: LessonDocument, slug: str) -> str:
+    """The lesson's '# ' heading, or its slug in title case."""
+    start = doc.frontmatter[1] if doc.frontmatter else 0
+    for line in doc.lines[start:]:
+        if line.startswith('# '):
+            return line[2:].strip()
+    return re.sub(r'^\d+-', '', slug).replace('-', ' ').title()
+
+
+def section_outcomes(doc: LessonDocument, title: str) -> List[str]:
+    """A section's bullets, or its text as one outcome if written as a paragraph."""
+    section = doc.find_section(title)
+    if section is None:
+        return []
+    bullets = [
+        line.strip()[2:].strip() for line in doc.lines[section.start + 1:section.end]
+        if line.strip().startswith('- ')
+    ]
+    if bullets:
+        return bullets
+    text = ' '.join(doc.section_text(section).split())
+    return [text] if text else []
+
+
+def quick_summary_text(doc: LessonDocument) -> Optional[str]:
+    if doc.quick_summary is None:
+        return None
+    text = ' '.join(line.lstrip('>').strip() for line in doc.quick_summary.text.split('\n'))
+    return text.replace('**Quick Summary:**', '', 1).strip()
+
+
+def body_text(doc: LessonDocument) -> str:
+    """Lesson text outside headings, frontmatter and code fences."""
+    start = doc.frontmatter[1] if doc.frontmatter else 0
+    in_fence = False
+    lines = []
+    for line in doc.lines[start:]:
+        if line.startswith('```'):
+            in_fence = not in_fence
+        elif not in_fence and not line.startswith('#'):
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+def lesson_entry(path: Path, doc: LessonDocument) -> dict:
+    relative = path.relative_to(CONTENT_DIR).with_suffix('')
+    parts = relative.parts
+    track = TRACKS.get(parts[0], parts[0])
+    if track == 'introduction':
+        platform, module = 'all', parts[0]
+    else:
+        platform = parts[1] if len(parts) > 2 else 'all'
+        module = parts[-2] if len(parts) > 1 else ''
+
+    entry = {
+        'path': relative.as_posix(),
+        'title': lesson_title(doc, parts[-1]),
+        'track': track,
+        'platform': platform,
+        'module': module,
+    }
+    estimated = read_frontmatter(doc).get('estimatedTime')
+    if estimated and estimated.isdigit():
+        entry['estimatedTime'] = int(estimated)
+    summary = quick_summary_text(doc)
+    if summary:
+        entry['summary'] = summary
+    entry['outline'] = [[level, title] for level, title in doc.outline()]
+    entry['outcomes'] = {key: section_outcomes(doc, title) for title, key in OUTCOME_SECTIONS.items()}
+    return entry
+
+
+def term_scores(entry: dict, doc: LessonDocument, include_body: bool) -> Counter:
+    scores = Counter()
+    fields = {
+        'title': [entry['title']],
+        'outline': [title for _, title in entry['outline'] if title not in OUTCOME_SECTIONS],
+        'summary': [entry.get('summary', '')],
+        'outcomes': [outcome for outcomes in entry['outcomes'].values() for outcome in outcomes],
+    }
+    if include_body:
+        fields['body'] = [body_text(doc)]
+    for field, texts in fields.items():
+        weight = WEIGHTS[field]
+        for text in texts:
+            for token in tokens(text):
+                scores[token] += weight
+    return scores
+
+
+def build_index(files: List[Path], include_body: bool = False) -> dict:
+    lessons = []
+    postings: Dict[str, List[List[int]]] = defaultdict(list)
+    for path in files:
+        doc = LessonDocument(decode_lesson(path.read_bytes()))
+        entry = lesson_entry(path, doc)
+        index = len(lessons)
+        lessons.append(entry)
+        for term, score in term_scores(entry, doc, include_body).items():
+            postings[term].append([index, score])
+
+    terms = {
+        term: sorted(entries, key=lambda posting: (-posting[1], posting[0]))
+        for term, entries in sorted(postings.items())
+    }
+    return {'version': INDEX_VERSION, 'lessons': lessons, 'terms': terms}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-o', '--output', type=Path, default=DEFAULT_OUTPUT,
+                        help=f"where to write the index (default: {DEFAULT_OUTPUT})")
+    parser.add_argument('--body', action='store_true', help="also index lesson body text (larger index)")
+    add_selection_arguments(parser, since=False)
+    args = parser.parse_args()
+
+    files = sorted(walk_markdown(CONTENT_DIR, file_filter(LESSONS, args)))
+    index = build_index(files, args.body)
+
+    data = json.dumps(index, ensure_ascii=False, separators=(',', ':'))
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    temp = args.output.with_name(args.output.name + '.tmp')
+    temp.write_text(data, encoding='utf-8')
+    temp.replace(args.output)
+    print(f"Indexed {len(index['lessons'])} lessons and {len(index['terms'])} terms "
+          f"into {args.output} ({len(data.encode('utf-8')) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Report what normalize-lessons.py would change, without changing anything.
+
+Prints one `path:line: rule: message` per violation and exits with status 1
+if there were any:
+
+  missing-what-youll-learn  a lesson with a Quick Summary but no "What You'll Learn"
+  paragraph-section         "What You'll Learn"/"Key Takeaways" written as a paragraph
+  long-bullet               a bullet refine-long-bullets.py would split or truncate
+  lowercase-bullet          a bullet starting with a lowercase letter
+  duplicate-bullet          a bullet repeated (case-insensitively) in the same section
+
+Only the target sections are looked at, and a lesson the prefilter finds no
+stage would change (see lesson_tools/prefilter.py) is passed without being
+decoded or parsed.
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List
+
+from lesson_tools import LessonDocument
+from lesson_tools.prefilter import mapped, needs_work
+from lesson_tools.runner import add_selection_arguments, decode_lesson, select_files
+from lesson_tools.stages import STAGES, load_script
+from lesson_tools.walk import LESSONS
+
+CONTENT_DIR = Path("content/course")
+WHAT_YOULL_LEARN = "What You'll Learn"
+KEY_TAKEAWAYS = "Key Takeaways"
+
+convert = load_script('convert-bullet-lists')
+refine = load_script('refine-long-bullets')
+case = load_script('fix-bullet-case-proper')
+
+# The stages whose changes are reported, as normalize-lessons.py runs them by default
+CHECKED_STAGES = [STAGES['convert'], STAGES['refine'], STAGES['case']]
+
+
+@dataclass
+class Violation:
+    path: Path
+    line: int  # 1-based
+    rule: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.path}:{self.line}: {self.rule}: {self.message}"
+
+
+def check_document(doc: LessonDocument, path: Path) -> Iterator[Violation]:
+    """Yield the violations in a parsed lesson, section by section."""
+    # convert-bullet-lists.py: the first section of each title must be bullets
+    for title in (WHAT_YOULL_LEARN, KEY_TAKEAWAYS):
+        section = doc.find_section(title)
+        if section is None:
+            if title == WHAT_YOULL_LEARN and doc.quick_summary is not None:
+                yield Violation(path, doc.quick_summary.start + 1, 'missing-what-youll-learn',
+                                f'no "{title}" section after the Quick Summary')
+        elif not convert.is_bullet_list(doc.section_text(section)):
+            yield Violation(path, section.start + 1, 'paragraph-section',
+                            f'"{title}" is a paragraph, not a bullet list')
+
+    # refine-long-bullets.py: long bullets, when at least one of them would split
+    edits = []
+    modified = False
+    for title in (WHAT_YOULL_LEARN, KEY_TAKEAWAYS):
+        section_edits, section_modified = refine.plan_section(doc, title)
+        edits.extend(section_edits)
+        modified = modified or section_modified
+    if modified:
+        for i, split_bullets in sorted(edits):
+            length = len(doc.lines[i].strip()) - 2
+            action = f"split into {len(split_bullets)}" if len(split_bullets) > 1 else "truncated"
+            yield Violation(path, i + 1, 'long-bullet',
+                            f"bullet is {length} characters (limit {refine.MAX_BULLET_LENGTH}), would be {action}")
+
+    # fix-bullet-case-proper.py: sentence case and no duplicates, ### subsections included
+    for section in doc.iter_sections(case.TARGET_SECTIONS):
+        seen = {}
+        for i in range(section.start + 1, section.outer_end):
+            line = doc.lines[i]
+            if not line.startswith('- '):
+                continue
+            bullet = line[2:].strip()
+            key = bullet.lower()
+            if key in seen:
+                yield Violation(path, i + 1, 'duplicate-bullet', f"repeats line {seen[key] + 1}")
+                continue
+            seen[key] = i
+            if bullet and bullet[0].islower():
+                yield Violation(path, i + 1, 'lowercase-bullet', "bullet starts with a lowercase letter")
+
+
+def check_file(path: Path) -> List[Violation]:
+    with mapped(path) as data:
+        if not needs_work(data, CHECKED_STAGES):
+            return []
+        text = decode_lesson(bytes(data))
+    return sorted(check_document(LessonDocument(text), path), key=lambda violation: violation.line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='*', type=Path, metavar='PATH',
+                        help=f"lessons to check (default: every lesson under {CONTENT_DIR})")
+    add_selection_arguments(parser, 'check')
+    parser.add_argument('-q', '--quiet', action='store_true', help="print only the summary")
+    args = parser.parse_args()
+
+    files = args.paths or sorted(select_files(CONTENT_DIR, LESSONS, args))
+
+    violation_count = 0
+    failed_files = 0
+    error_count = 0
+    for path in files:
+        try:
+            violations = check_file(path)
+        except Exception as e:
+            print(f"Error checking {path}: {e}", file=sys.stderr)
+            error_count += 1
+            continue
+        if violations:
+            failed_files += 1
+            violation_count += len(violations)
+            if not args.quiet:
+                for violation in violations:
+                    print(violation)
+
+    if violation_count or error_count:
+        print(f"\n{violation_count} violations in {failed_files} of {len(files)} files"
+              + (f", {error_count} files could not be checked" if error_count else ""), file=sys.stderr)
+        return 1
+    print(f"Checked {len(files)} files: clean", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
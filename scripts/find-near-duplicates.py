@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Find near-duplicate bullets across every lesson and track.
+
+fix-bullet-case-proper.py only drops exact (case-insensitive) repeats within
+one section. This scans the "What You'll Learn" and "Key Takeaways" bullets of
+the whole corpus, groups bullets whose character shingles overlap by at least
+--threshold (Jaccard similarity) into clusters, and reports every cluster
+spanning more than one bullet. Candidates come from MinHash/LSH buckets (see
+lesson_tools.minhash), so the scan stays roughly linear in the number of
+bullets rather than comparing every pair.
+
+With --collapse, a bullet that is a near-duplicate of an earlier bullet in the
+same section is removed from the lesson; copies in other lessons are left
+alone, since each lesson should stand on its own.
+"""
+
+import argparse
+import json
+import sys
+from array import array
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, List, NamedTuple
+
+from lesson_tools import LessonDocument
+from lesson_tools.minhash import LSHIndex, estimate, jaccard, min_collisions, normalize, shingles, signature
+from lesson_tools.model import Lesson
+from lesson_tools.runner import (
+    add_selection_arguments, decode_lesson, render_lesson, report_stream, select_files, unified_diff,
+)
+from lesson_tools.walk import LESSONS
+
+CONTENT_DIR = Path("content/course")
+TARGET_SECTIONS = ("What You'll Learn", "Key Takeaways")
+DEFAULT_THRESHOLD = 0.8
+# Candidates whose signatures estimate a similarity this far below the
+# threshold are rejected without computing the exact Jaccard similarity
+ESTIMATE_SLACK = 0.2
+
+
+class Bullet(NamedTuple):
+    file: int  # index into the scanned files
+    section: int  # line of the section heading
+    line: int  # 0-based line of the bullet
+    text: int  # index into the distinct normalized texts
+
+
+@lru_cache(maxsize=4096)
+def bullet_shingles(text: str) -> FrozenSet[int]:
+    return shingles(text)
+
+
+class Corpus:
+    """Every target-section bullet, with near-duplicate texts joined by union-find."""
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.files: List[Path] = []
+        self.bullets: List[Bullet] = []
+        self.texts: List[str] = []  # first raw bullet seen for each distinct text
+        self.signatures: List[array] = []
+        self.text_ids: Dict[str, int] = {}
+        self.parent: List[int] = []
+        self.index = LSHIndex()
+        self.min_collisions = min_collisions(threshold)
+
+    def find(self, text: int) -> int:
+        parent = self.parent
+        while parent[text] != text:
+            parent[text] = parent[parent[text]]
+            text = parent[text]
+        return text
+
+    def union(self, a: int, b: int) -> None:
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+    def similar(self, a: str, b: str) -> bool:
+        a, b = bullet_shingles(a), bullet_shingles(b)
+        if min(len(a), len(b)) < self.threshold * max(len(a), len(b)):
+            return False  # too different in size to reach the threshold
+        return jaccard(a, b) >= self.threshold
+
+    def add_text(self, bullet: str) -> int:
+        key = normalize(bullet)
+        text = self.text_ids.get(key)
+        if text is not None:
+            return text
+        text = len(self.texts)
+        self.text_ids[key] = text
+        self.texts.append(bullet)
+        self.parent.append(text)
+        sig = array('Q', signature(bullet_shingles(bullet)))
+        self.signatures.append(sig)
+        candidates = self.index.add(text, sig)
+        for other, collisions in candidates.most_common():
+            if collisions < self.min_collisions:
+                break
+            if (self.find(other) != self.find(text)
+                    and estimate(sig, self.signatures[other]) >= self.threshold - ESTIMATE_SLACK
+                    and self.similar(bullet, self.texts[other])):
+                self.union(text, other)
+        return text
+
+    def add_file(self, path: Path) -> None:
+        content = decode_lesson(path.read_bytes())
+        if not any(f"## {title}" in content for title in TARGET_SECTIONS):
+            return
+        lesson = Lesson(content, path)
+        file = len(self.files)
+        self.files.append(path)
+        for section in lesson.iter_sections(TARGET_SECTIONS):
+            for bullet in section.bullets():
+                text = bullet.text
+                if text:
+                    self.bullets.append(Bullet(file, section.start, bullet.index, self.add_text(text)))
+
+    def clusters(self, min_size: int) -> List[List[Bullet]]:
+        """Clusters of at least min_size bullets, largest first."""
+        groups = defaultdict(list)
+        for bullet in self.bullets:
+            groups[self.find(bullet.text)].append(bullet)
+        clusters = [group for group in groups.values() if len(group) >= min_size]
+        clusters.sort(key=lambda group: (-len(group), group[0]))
+        return clusters
+
+    def collapsible(self, clusters: List[List[Bullet]]) -> Dict[int, List[Bullet]]:
+        """Per file, the bullets that repeat an earlier bullet of their section."""
+        by_section = defaultdict(list)
+        for cluster in clusters:
+            for bullet in cluster:
+                by_section[bullet.file, bullet.section, self.find(bullet.text)].append(bullet)
+
+        drops = defaultdict(list)
+        for bullets in by_section.values():
+            kept: List[Bullet] = []
+            for bullet in sorted(bullets, key=lambda b: b.line):
+                # Clusters are transitive, so check the pair directly before dropping
+                if any(k.text == bullet.text or self.similar(self.texts[k.text], self.texts[bullet.text])
+                       for k in kept):
+                    drops[bullet.file].append(bullet)
+                else:
+                    kept.append(bullet)
+        return drops
+
+
+def collapse_file(corpus: Corpus, path: Path, drops: List[Bullet], write: bool, diff: bool) -> None:
+    data = path.read_bytes()
+    content = decode_lesson(data)
+    doc = LessonDocument(content)
+    for bullet in drops:
+        line = doc.lines[bullet.line] if bullet.line < len(doc.lines) else ''
+        if normalize(line[2:]) != normalize(corpus.texts[bullet.text]):
+            raise ValueError("changed since it was scanned, left as is")
+    for bullet in sorted(drops, key=lambda b: b.line, reverse=True):
+        doc.replace(bullet.line, bullet.line + 1, [])
+    new_data = render_lesson(data, content, doc)
+    if new_data is None:
+        return
+    if diff:
+        sys.stdout.write(unified_diff(path, data, new_data))
+        sys.stdout.flush()
+    if write:
+        path.write_bytes(new_data)
+
+
+def cluster_json(corpus: Corpus, cluster: List[Bullet]) -> dict:
+    return {
+        'size': len(cluster),
+        'lessons': len({bullet.file for bullet in cluster}),
+        'bullets': [
+            {'path': corpus.files[bullet.file].as_posix(), 'line': bullet.line + 1,
+             'text': corpus.texts[bullet.text]}
+            for bullet in cluster
+        ],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, metavar='J',
+                        help=f"Jaccard similarity at which bullets count as duplicates (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument('--min-size', type=int, default=2, metavar='N',
+                        help="only report clusters of at least N bullets (default: 2)")
+    add_selection_arguments(parser, 'scan')
+    parser.add_argument('--json', type=Path, metavar='PATH', help="also write the clusters to PATH as JSON")
+    parser.add_argument('-q', '--quiet', action='store_true', help="print only the summary")
+    parser.add_argument('--collapse', action='store_true',
+                        help="remove bullets that near-duplicate an earlier bullet in the same section")
+    parser.add_argument('-n', '--dry-run', action='store_true', help="with --collapse, report without writing")
+    parser.add_argument('--diff', action='store_true',
+                        help="with --collapse, like --dry-run and stream a unified diff to stdout")
+    args = parser.parse_args()
+    if not 0 < args.threshold <= 1:
+        parser.error("--threshold must be in (0, 1]")
+    out = report_stream(args)
+
+    corpus = Corpus(args.threshold)
+    error_count = 0
+    for path in sorted(select_files(CONTENT_DIR, LESSONS, args)):
+        try:
+            corpus.add_file(path)
+        except Exception as e:
+            print(f"Error reading {path}: {e}", file=sys.stderr)
+            error_count += 1
+
+    clusters = corpus.clusters(max(2, args.min_size))
+    if not args.quiet:
+        for number, cluster in enumerate(clusters, 1):
+            lessons = len({bullet.file for bullet in cluster})
+            print(f"Cluster {number}: {len(cluster)} bullets in {lessons} lessons", file=out)
+            for bullet in cluster:
+                print(f"  {corpus.files[bullet.file]}:{bullet.line + 1}: {corpus.texts[bullet.text]}", file=out)
+    print(f"\nScanned {len(corpus.bullets)} bullets ({len(corpus.texts)} distinct) "
+          f"in {len(corpus.files)} lessons: {len(clusters)} clusters, "
+          f"{sum(len(cluster) for cluster in clusters)} bullets", file=out)
+
+    if args.json:
+        data = {'threshold': args.threshold, 'clusters': [cluster_json(corpus, c) for c in clusters]}
+        args.json.write_text(json.dumps(data, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+        print(f"Wrote clusters to {args.json}", file=out)
+
+    if args.collapse:
+        write = not (args.dry_run or args.diff)
+        drops = corpus.collapsible(clusters)
+        removed = 0
+        for file, bullets in sorted(drops.items()):
+            path = corpus.files[file]
+            try:
+                collapse_file(corpus, path, bullets, write, args.diff)
+            except Exception as e:
+                print(f"Error collapsing {path}: {e}", file=sys.stderr)
+                error_count += 1
+                continue
+            removed += len(bullets)
+            print(f"Collapsed: {path} ({len(bullets)} bullets)", file=out)
+        print(f"Removed {removed} near-duplicate bullets from {len(drops)} files", file=out)
+        if not write:
+            print("Dry run: no files were written", file=out)
+
+    return 1 if error_count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,10 +4,23 @@ Convert bullet points in "What You'll Learn" and "Key Takeaways" sections to pro
 and remove duplicates.
 """
 
-import re
+import argparse
 import sys
 from pathlib import Path
 
+from lesson_tools import LessonDocument, instrument
+from lesson_tools.rules import BULLETS, LESSON_RULES
+from lesson_tools.runner import (
+    add_runner_arguments, process_files, process_lesson, report_result, report_stream, report_summary,
+    select_files, watch_and_report,
+)
+from lesson_tools.stages import STAGES
+from lesson_tools.streaming import tag_sections
+
+TARGET_SECTIONS = ("What You'll Learn", "Key Takeaways")
+# Bump whenever the output changes, so --manifest reprocesses every file
+TRANSFORM_VERSION = 1
+
 def to_sentence_case(text):
     """Convert text to sentence case (capitalize first letter only if it's lowercase)."""
     if not text:
@@ -17,84 +30,127 @@ def to_sentence_case(text):
         return text[0].upper() + text[1:]
     return text
 
-def fix_bullet_case_and_remove_duplicates(content):
-    """Convert bullet points in target sections to sentence case and remove duplicates."""
-    lines = content.split('\n')
-    result = []
-    i = 0
-    in_target_section = False
-    seen_bullets = set()
+def transform_document(doc):
+    """Sentence-case and dedupe bullets in the target sections of a parsed lesson."""
+    modified = False
     
-    while i < len(lines):
-        line = lines[i]
+    # A section runs until the next ## header (### subsections stay inside it)
+    for section in reversed(list(doc.iter_sections(TARGET_SECTIONS))):
+        seen_bullets = set()  # Reset for each section
+        body = doc.lines[section.start + 1:section.outer_end]
+        result = []
         
-        # Check if we're entering a target section
-        if re.match(r'^## (What You\'ll Learn|Key Takeaways)$', line):
-            in_target_section = True
-            seen_bullets = set()  # Reset for new section
+        for line in body:
+            if LESSON_RULES.classify(line) in BULLETS:
+                # Extract the content after "- "
+                bullet_content = line[2:].strip()
+                
+                # Check for duplicates (case-insensitive)
+                bullet_lower = bullet_content.lower()
+                if bullet_lower in seen_bullets:
+                    # Skip duplicate
+                    instrument.hit('case.dedupe')
+                    continue
+                
+                seen_bullets.add(bullet_lower)
+                
+                # Convert to sentence case
+                if bullet_content:
+                    # Only convert if it starts with lowercase
+                    if bullet_content[0].islower():
+                        bullet_content = to_sentence_case(bullet_content)
+                        instrument.hit('case.sentence_case')
+                    line = f"- {bullet_content}"
+            
             result.append(line)
-            i += 1
-            continue
         
-        # Check if we're leaving the section (hit another ## header)
-        if in_target_section and line.startswith('##') and not line.startswith('###'):
-            in_target_section = False
-            seen_bullets = set()
+        if result != body:
+            doc.replace(section.start + 1, section.outer_end, result)
+            modified = True
+    
+    return modified
+
+def might_change(lesson):
+    """Byte-level check: False if every target-section bullet is unique, sentence-cased and tidy."""
+    for body in lesson.section_bodies(TARGET_SECTIONS):
+        seen_bullets = set()
+        for line in body:
+            if LESSON_RULES.classify(line) in BULLETS:
+                bullet_content = line[2:].strip()
+                bullet_lower = bullet_content.lower()
+                if bullet_lower in seen_bullets:
+                    return True
+                seen_bullets.add(bullet_lower)
+                if bullet_content and f"- {to_sentence_case(bullet_content)}" != line:
+                    return True
+    return False
+
+def transform_lines(lines, status):
+    """Streaming form of transform_document: yield the lines with bullets fixed."""
+    seen_bullets = set()
+    current = None
+    for line, rule, section in tag_sections(lines, TARGET_SECTIONS):
+        if section is None or rule not in BULLETS:
+            yield line
+            continue
+        if section != current:
+            seen_bullets = set()  # Reset for each section
+            current = section
         
-        # If we're in a target section and this is a bullet point
-        if in_target_section and line.startswith('- '):
-            # Extract the content after "- "
-            bullet_content = line[2:].strip()
-            
-            # Check for duplicates (case-insensitive)
-            bullet_lower = bullet_content.lower()
-            if bullet_lower in seen_bullets:
-                # Skip duplicate
-                i += 1
-                continue
-            
-            seen_bullets.add(bullet_lower)
-            
-            # Convert to sentence case
-            if bullet_content:
-                # Only convert if it starts with lowercase
-                if bullet_content[0].islower():
-                    bullet_content = to_sentence_case(bullet_content)
-                line = f"- {bullet_content}"
+        bullet_content = line[2:].strip()
+        bullet_lower = bullet_content.lower()
+        if bullet_lower in seen_bullets:
+            instrument.hit('case.dedupe')
+            status.changed = status.rewrote = True
+            continue
+        seen_bullets.add(bullet_lower)
         
-        result.append(line)
-        i += 1
-    
-    return '\n'.join(result)
+        if bullet_content:
+            if bullet_content[0].islower():
+                bullet_content = to_sentence_case(bullet_content)
+                instrument.hit('case.sentence_case')
+            fixed = f"- {bullet_content}"
+            if fixed != line:
+                status.changed = status.rewrote = True
+            line = fixed
+        yield line
+
+def fix_bullet_case_and_remove_duplicates(content):
+    """Convert bullet points in target sections to sentence case and remove duplicates."""
+    doc = LessonDocument(content)
+    if not transform_document(doc):
+        return content
+    return doc.text()
 
 def process_file(file_path):
     """Process a single markdown file."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        new_content = fix_bullet_case_and_remove_duplicates(content)
-        
-        if content != new_content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
-            return True
-        return False
-    except Exception as e:
-        print(f"Error processing {file_path}: {e}", file=sys.stderr)
-        return False
+    result = process_lesson(Path(file_path), [STAGES['case']])
+    if result.error:
+        print(f"Error processing {file_path}: {result.error}", file=sys.stderr)
+    return result.modified
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_runner_arguments(parser)
+    args = parser.parse_args()
+    out = report_stream(args)
+    
     content_dir = Path('content')
-    md_files = list(content_dir.rglob('*.md'))
+    md_files = select_files(content_dir, None, args)
     
     changed_count = 0
-    for md_file in md_files:
-        if process_file(md_file):
+    skipped_count = 0
+    for result in process_files(sorted(md_files), [STAGES['case']], args):
+        report_result(result, "Fixed", out)
+        if result.modified:
             changed_count += 1
-            print(f"Fixed: {md_file}")
+        elif result.skipped:
+            skipped_count += 1
     
-    print(f"\nProcessed {len(md_files)} files, changed {changed_count} files")
+    print(f"\nProcessed {len(md_files)} files, changed {changed_count} files", file=out)
+    report_summary(args, skipped_count, out)
+
+    watch_and_report(content_dir, None, [STAGES['case']], args, "Fixed", out)
 
 if __name__ == '__main__':
     main()
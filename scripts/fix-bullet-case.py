@@ -3,69 +3,96 @@
 Convert bullet points in "What You'll Learn" and "Key Takeaways" sections to sentence case.
 """
 
-import re
+import argparse
 import sys
 from pathlib import Path
 
-def fix_bullet_case(content):
-    """Convert bullet points in target sections to sentence case."""
-    lines = content.split('\n')
-    result = []
-    i = 0
-    in_target_section = False
+from lesson_tools import LessonDocument, instrument
+from lesson_tools.rules import LESSON_RULES
+from lesson_tools.runner import (
+    add_runner_arguments, process_files, process_lesson, report_result, report_stream, report_summary,
+    select_files, watch_and_report,
+)
+from lesson_tools.stages import STAGES
+from lesson_tools.streaming import tag_sections
+
+TARGET_SECTIONS = ("What You'll Learn", "Key Takeaways")
+# Bump whenever the output changes, so --manifest reprocesses every file
+TRANSFORM_VERSION = 1
+
+def transform_document(doc):
+    """Lowercase the first letter of bullets in the target sections of a parsed lesson."""
+    modified = False
     
-    while i < len(lines):
-        line = lines[i]
-        
-        # Check if we're entering a target section
-        if re.match(r'^## (What You\'ll Learn|Key Takeaways)$', line):
-            in_target_section = True
+    # A section runs until the next ## header (### subsections stay inside it)
+    for section in reversed(list(doc.iter_sections(TARGET_SECTIONS))):
+        body = doc.lines[section.start + 1:section.outer_end]
+        result = []
+        for line in body:
+            # If this is a bullet point starting with capital
+            if LESSON_RULES.classify(line) == 'capital_bullet':
+                # Convert first letter after "- " to lowercase
+                line = line[:2] + line[2].lower() + line[3:]
+                instrument.hit('lowercase.bullet')
             result.append(line)
-            i += 1
-            continue
-        
-        # Check if we're leaving the section (hit another ## header)
-        if in_target_section and line.startswith('##') and not line.startswith('###'):
-            in_target_section = False
         
-        # If we're in a target section and this is a bullet point starting with capital
-        if in_target_section and re.match(r'^- [A-Z]', line):
-            # Convert first letter after "- " to lowercase
-            line = re.sub(r'^(- )([A-Z])', lambda m: m.group(1) + m.group(2).lower(), line, count=1)
-        
-        result.append(line)
-        i += 1
+        # One replace per section, as in fix-bullet-case-proper.py
+        if result != body:
+            doc.replace(section.start + 1, section.outer_end, result)
+            modified = True
     
-    return '\n'.join(result)
+    return modified
+
+def might_change(lesson):
+    """Byte-level check: False if no target-section bullet starts with a capital."""
+    return any(LESSON_RULES.classify(line) == 'capital_bullet'
+               for body in lesson.section_bodies(TARGET_SECTIONS) for line in body)
+
+def transform_lines(lines, status):
+    """Streaming form of transform_document: yield the lines with bullets lowercased."""
+    for line, rule, section in tag_sections(lines, TARGET_SECTIONS):
+        if section is not None and rule == 'capital_bullet':
+            line = line[:2] + line[2].lower() + line[3:]
+            instrument.hit('lowercase.bullet')
+            status.changed = status.rewrote = True
+        yield line
+
+def fix_bullet_case(content):
+    """Convert bullet points in target sections to sentence case."""
+    doc = LessonDocument(content)
+    if not transform_document(doc):
+        return content
+    return doc.text()
 
 def process_file(file_path):
     """Process a single markdown file."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        new_content = fix_bullet_case(content)
-        
-        if content != new_content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
-            return True
-        return False
-    except Exception as e:
-        print(f"Error processing {file_path}: {e}", file=sys.stderr)
-        return False
+    result = process_lesson(Path(file_path), [STAGES['lowercase']])
+    if result.error:
+        print(f"Error processing {file_path}: {result.error}", file=sys.stderr)
+    return result.modified
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_runner_arguments(parser)
+    args = parser.parse_args()
+    out = report_stream(args)
+    
     content_dir = Path('content')
-    md_files = list(content_dir.rglob('*.md'))
+    md_files = select_files(content_dir, None, args)
     
     changed_count = 0
-    for md_file in md_files:
-        if process_file(md_file):
+    skipped_count = 0
+    for result in process_files(sorted(md_files), [STAGES['lowercase']], args):
+        report_result(result, "Fixed", out)
+        if result.modified:
             changed_count += 1
-            print(f"Fixed: {md_file}")
+        elif result.skipped:
+            skipped_count += 1
     
-    print(f"\nProcessed {len(md_files)} files, changed {changed_count} files")
+    print(f"\nProcessed {len(md_files)} files, changed {changed_count} files", file=out)
+    report_summary(args, skipped_count, out)
+
+    watch_and_report(content_dir, None, [STAGES['lowercase']], args, "Fixed", out)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Serve the lesson text transforms to other processes as JSON lines on stdin/stdout.
+
+Tools that normalize lesson text on the fly (the Next.js build, editor
+tooling) start this once and send it requests, instead of starting a script,
+and walking the content tree, per file. Each request is one line of JSON:
+
+  {"id": 1, "op": "split_long_bullet", "text": "- A bullet over the limit, ..."}
+
+and gets one line back, in order, with the same id:
+
+  {"id": 1, "result": ["- A bullet over the limit", "- ..."]}
+
+or {"id": 1, "error": "..."} if it failed; the worker carries on either way.
+A line holding a JSON array of requests is a batch, answered by one line
+holding the array of their responses, so a client can send a whole file's
+sections in one round trip. The operations:
+
+  paragraph_to_bullets                   paragraph -> list of bullet texts
+  split_long_bullet                      '- ' bullet line -> list of bullet lines
+  fix_bullet_case_and_remove_duplicates  lesson -> lesson
+  generate_what_youll_learn              lesson -> list of bullet texts
+
+The scripts behind them are loaded on first use and stay loaded, and their
+results are cached like in a run (with --cache, on disk across runs too).
+The worker exits at the end of its input.
+"""
+
+import argparse
+import io
+import json
+import sys
+from typing import Callable, Dict, Tuple
+
+from lesson_tools import memo
+from lesson_tools.runner import add_cache_arguments
+from lesson_tools.stages import load_script
+
+# op -> (script in this directory, function)
+OPERATIONS: Dict[str, Tuple[str, str]] = {
+    'paragraph_to_bullets': ('convert-bullet-lists', 'paragraph_to_bullets'),
+    'split_long_bullet': ('refine-long-bullets', 'split_long_bullet'),
+    'fix_bullet_case_and_remove_duplicates': ('fix-bullet-case-proper', 'fix_bullet_case_and_remove_duplicates'),
+    'generate_what_youll_learn': ('convert-bullet-lists', 'generate_what_youll_learn'),
+}
+
+
+class BadRequest(Exception):
+    """A request the worker cannot run: unknown op, missing text."""
+
+
+def operation(op: object) -> Callable[[str], object]:
+    if not isinstance(op, str) or op not in OPERATIONS:
+        raise BadRequest(f"unknown op {op!r} (choose from {', '.join(OPERATIONS)})")
+    script, function = OPERATIONS[op]
+    return getattr(load_script(script), function)
+
+
+def handle(request: object) -> dict:
+    """Run one request and return its response; never raises for a bad request."""
+    if not isinstance(request, dict):
+        return {'id': None, 'error': "a request must be a JSON object"}
+    response = {'id': request.get('id')}
+    try:
+        transform = operation(request.get('op'))
+        text = request.get('text')
+        if not isinstance(text, str):
+            raise BadRequest("'text' must be a string")
+        response['result'] = transform(text)
+    except BadRequest as e:
+        response['error'] = str(e)
+    except Exception as e:
+        response['error'] = f"{type(e).__name__}: {e}"
+    return response
+
+
+def respond(line: str) -> str:
+    """The response line for one request line, a batch or a single request."""
+    try:
+        request = json.loads(line)
+    except ValueError as e:
+        response = {'id': None, 'error': f"invalid JSON: {e}"}
+    else:
+        response = [handle(item) for item in request] if isinstance(request, list) else handle(request)
+    return json.dumps(response, ensure_ascii=False, separators=(',', ':'))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_cache_arguments(parser)
+    args = parser.parse_args()
+
+    if args.cache is not None:
+        try:
+            memo.configure(args.cache, args.cache_size)
+        except Exception as e:
+            raise SystemExit(f"--cache {args.cache}: {e}")
+
+    # UTF-8 both ways whatever the locale; one flush per response line
+    requests = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', errors='replace')
+    responses = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline='\n')
+    try:
+        for line in requests:
+            if not line.strip():
+                continue
+            responses.write(respond(line) + '\n')
+            responses.flush()
+            memo.flush(force=False)
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
+    finally:
+        memo.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+"""
+Shared helpers for the lesson normalization scripts in this directory.
+"""
+
+from .document import Heading, LessonDocument, QuickSummary, Section
+
+__all__ = ["Heading", "LessonDocument", "QuickSummary", "Section"]
@@ -0,0 +1,38 @@
+"""
+Ask git which lessons changed, for --since.
+
+Only the files git reports are looked at, so a run over a small change costs
+the same however large the corpus is.
+"""
+
+import subprocess
+from pathlib import Path
+from typing import List
+
+
+class GitError(RuntimeError):
+    pass
+
+
+def _git_names(*args: str) -> List[str]:
+    try:
+        completed = subprocess.run(
+            ['git', *args], capture_output=True, text=True, encoding='utf-8', check=True,
+        )
+    except FileNotFoundError:
+        raise GitError("git is not installed")
+    except subprocess.CalledProcessError as e:
+        raise GitError(e.stderr.strip() or f"git {args[0]} failed")
+    return [name for name in completed.stdout.split('\0') if name]
+
+
+def changed_files(ref: str, directory: Path) -> List[Path]:
+    """Existing '*.md' files under directory added or modified since ref, or staged.
+
+    Paths are relative to the current directory, like `directory.rglob`.
+    """
+    pathspec = ['--', str(directory)]
+    names = set(_git_names('diff', '--name-only', '-z', '--relative', '--diff-filter=AMR', ref, *pathspec))
+    names.update(_git_names('diff', '--name-only', '-z', '--relative', '--diff-filter=AMR', '--cached', *pathspec))
+    paths = (Path(name) for name in sorted(names) if name.endswith('.md'))
+    return [path for path in paths if path.is_file()]
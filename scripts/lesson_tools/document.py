@@ -0,0 +1,290 @@
+"""
+Single-pass lesson document model: a lesson is split into lines and indexed
+once, then edited through `LessonDocument.replace`, which keeps the index in step.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from .rules import QUICK_SUMMARY_MARKER
+FRONTMATTER_DELIMITER = '---'
+
+# Pieces kept before the runs between the first and last edit are merged, so a
+# replace costs the same however many came before it
+MAX_PIECES = 64
+
+# (first original line, end original line, lines replacing that range)
+LineEdit = Tuple[int, int, List[str]]
+
+
+def heading_level(line: str) -> int:
+    """Return the number of leading '#' characters."""
+    return len(line) - len(line.lstrip('#'))
+
+
+@dataclass
+class Heading:
+    """A line starting with '##' and its position in the document."""
+    index: int
+    level: int
+    line: str
+
+    @property
+    def title(self) -> str:
+        return self.line[self.level:].strip()
+
+
+@dataclass
+class Section:
+    """A heading plus the line ranges its body covers.
+
+    `end` is the next line starting with '##' (any depth), which is where the
+    section scripts stop reading bullets. `outer_end` is the next level-2
+    heading, so it includes any '###' subsections.
+    """
+    heading: Heading
+    end: int
+    outer_end: int
+
+    @property
+    def start(self) -> int:
+        return self.heading.index
+
+    @property
+    def title(self) -> str:
+        return self.heading.title
+
+
+@dataclass
+class QuickSummary:
+    """The Quick Summary blockquote.
+
+    `end` is the first line after the blockquote and any blank lines that
+    follow it, i.e. where a new section would be inserted.
+    """
+    start: int
+    end: int
+    text: str
+
+
+class LessonDocument:
+    """A lesson split into lines once, with an index of its structure.
+
+    Sections returned by the lookup methods are snapshots: after `replace`,
+    edit bottom-up or look the section up again.
+    """
+
+    def __init__(self, text: str):
+        self.lines = text.split('\n')
+        # The lines in order: ranges of original line numbers, counts of new lines,
+        # so `edits` never walks the unchanged lines (see lesson_tools.splice)
+        self.pieces: List[Union[range, int]] = [range(len(self.lines))]
+        self.original_length = len(self.lines)
+        self.headings: List[Heading] = []
+        self.frontmatter: Optional[Tuple[int, int]] = None
+        self.quick_summary: Optional[QuickSummary] = None
+
+        frontmatter_open = bool(self.lines) and self.lines[0] == FRONTMATTER_DELIMITER
+        summary_start = None
+        for i, line in enumerate(self.lines):
+            if line.startswith('##'):
+                self.headings.append(Heading(i, heading_level(line), line))
+            if summary_start is None and QUICK_SUMMARY_MARKER in line:
+                summary_start = i
+            if frontmatter_open and i > 0 and line == FRONTMATTER_DELIMITER:
+                self.frontmatter = (0, i + 1)
+                frontmatter_open = False
+
+        if summary_start is not None:
+            self.quick_summary = self._read_quick_summary(summary_start)
+
+    @classmethod
+    def read(cls, path: Path) -> 'LessonDocument':
+        return cls(path.read_text(encoding='utf-8'))
+
+    def text(self) -> str:
+        return '\n'.join(self.lines)
+
+    def _read_quick_summary(self, start: int) -> QuickSummary:
+        lines = self.lines
+        summary_lines = [lines[start]]
+        j = start + 1
+        while j < len(lines) and (lines[j].startswith('>') or not lines[j].strip()):
+            if lines[j].startswith('>'):
+                summary_lines.append(lines[j])
+            j += 1
+        return QuickSummary(start, j, '\n'.join(summary_lines))
+
+    def _find_quick_summary(self) -> Optional[QuickSummary]:
+        for i, line in enumerate(self.lines):
+            if QUICK_SUMMARY_MARKER in line:
+                return self._read_quick_summary(i)
+        return None
+
+    def _find_frontmatter(self) -> Optional[Tuple[int, int]]:
+        if not self.lines or self.lines[0] != FRONTMATTER_DELIMITER:
+            return None
+        for i in range(1, len(self.lines)):
+            if self.lines[i] == FRONTMATTER_DELIMITER:
+                return (0, i + 1)
+        return None
+
+    def _section_at(self, position: int) -> Section:
+        heading = self.headings[position]
+        following = self.headings[position + 1:]
+        end = following[0].index if following else len(self.lines)
+        outer_end = next((h.index for h in following if h.level == 2), len(self.lines))
+        return Section(heading, end, outer_end)
+
+    def sections(self) -> Iterator[Section]:
+        """Yield a section for every '##'/'###' heading, in document order."""
+        for position, heading in enumerate(self.headings):
+            if heading.level in (2, 3):
+                yield self._section_at(position)
+
+    def outline(self) -> List[Tuple[int, str]]:
+        """Return (level, title) for every titled '##'/'###' heading."""
+        outline = []
+        for heading in self.headings:
+            rest = heading.line[heading.level:]
+            if heading.level in (2, 3) and rest[:1].isspace() and rest.strip():
+                outline.append((heading.level, rest.strip()))
+        return outline
+
+    def iter_sections(self, titles: Iterable[str], level: int = 2) -> Iterator[Section]:
+        """Yield every section whose heading is exactly '<#s> <title>'."""
+        prefix = '#' * level + ' '
+        wanted = {prefix + title for title in titles}
+        for position, heading in enumerate(self.headings):
+            if heading.line in wanted:
+                yield self._section_at(position)
+
+    def find_section(self, title: str, level: int = 2) -> Optional[Section]:
+        """Return the first section titled `title`, or None."""
+        return next(self.iter_sections([title], level), None)
+
+    def section_text(self, section: Section) -> str:
+        """Return a section body without surrounding blank lines."""
+        start, end = section.start + 1, section.end
+        while start < end and not self.lines[start].strip():
+            start += 1
+        while end > start and not self.lines[end - 1].strip():
+            end -= 1
+        return '\n'.join(self.lines[start:end]).strip()
+
+    def replace(self, start: int, end: int, new_lines: Iterable[str]) -> None:
+        """Replace lines[start:end] and update the index to match."""
+        new_lines = list(new_lines)
+        old_lines = self.lines[start:end]
+        # Lines the replacement leaves as they were stay original lines
+        same_start = 0
+        limit = min(len(old_lines), len(new_lines))
+        while same_start < limit and old_lines[same_start] == new_lines[same_start]:
+            same_start += 1
+        same_end = 0
+        while (same_end < limit - same_start
+               and old_lines[len(old_lines) - 1 - same_end] == new_lines[len(new_lines) - 1 - same_end]):
+            same_end += 1
+        if same_start + same_end < max(len(old_lines), len(new_lines)):
+            self._replace_pieces(start + same_start, end - same_end,
+                                 len(new_lines) - same_end - same_start)
+        self.lines[start:end] = new_lines
+        delta = len(new_lines) - (end - start)
+
+        before = [h for h in self.headings if h.index < start]
+        inserted = [
+            Heading(start + k, heading_level(line), line)
+            for k, line in enumerate(new_lines)
+            if line.startswith('##')
+        ]
+        after = [
+            Heading(h.index + delta, h.level, h.line)
+            for h in self.headings
+            if h.index >= end
+        ]
+        self.headings = before + inserted + after
+
+        summary = self.quick_summary
+        if any(QUICK_SUMMARY_MARKER in line for line in new_lines):
+            self.quick_summary = self._find_quick_summary()
+        elif summary is not None and end <= summary.start:
+            self.quick_summary = QuickSummary(summary.start + delta, summary.end + delta, summary.text)
+        elif summary is not None and start <= summary.end:
+            self.quick_summary = self._find_quick_summary()
+
+        # Also when the new lines may close a frontmatter block that had no end
+        if (start == 0 or (self.frontmatter is not None and start < self.frontmatter[1])
+                or (self.frontmatter is None and FRONTMATTER_DELIMITER in new_lines)):
+            self.frontmatter = self._find_frontmatter()
+
+    def _replace_pieces(self, start: int, end: int, count: int) -> None:
+        pieces: List[Union[range, int]] = []
+        position = 0
+        for piece in self.pieces:
+            size = piece if isinstance(piece, int) else len(piece)
+            piece_end = position + size
+            if piece_end <= start or position >= end:
+                if position == end and count:
+                    _add_piece(pieces, count)
+                    count = 0
+                _add_piece(pieces, piece)
+            else:
+                if position < start:
+                    _add_piece(pieces, _piece_slice(piece, 0, start - position))
+                if count:
+                    _add_piece(pieces, count)
+                    count = 0
+                if piece_end > end:
+                    _add_piece(pieces, _piece_slice(piece, end - position, size))
+            position = piece_end
+        if count:
+            _add_piece(pieces, count)  # appended at the very end
+        if len(pieces) > MAX_PIECES:
+            # Keep the untouched head and tail; everything between becomes one run of new lines
+            head = pieces[:1] if isinstance(pieces[0], range) else []
+            tail = pieces[-1:] if isinstance(pieces[-1], range) else []
+            middle = pieces[len(head):len(pieces) - len(tail)]
+            pieces = head + [sum(p if isinstance(p, int) else len(p) for p in middle)] + tail
+        self.pieces = pieces
+
+    def edits(self) -> List[LineEdit]:
+        """The changes made through `replace`, as edits of the original lines, in order.
+
+        Each (start, end, lines) replaces original lines [start, end) with
+        `lines`; applying them all to the original yields `lines`.
+        """
+        edits = []
+        expected = 0
+        position = 0
+        inserted = None  # where the current run of new lines began
+        for piece in self.pieces:
+            if isinstance(piece, int):
+                if inserted is None:
+                    inserted = position
+                position += piece
+                continue
+            if piece.start != expected or inserted is not None:
+                edits.append((expected, piece.start, self.lines[inserted:position] if inserted is not None else []))
+                inserted = None
+            expected = piece.stop
+            position += len(piece)
+        if expected != self.original_length or inserted is not None:
+            edits.append((expected, self.original_length,
+                           self.lines[inserted:position] if inserted is not None else []))
+        return edits
+
+
+def _piece_slice(piece: Union[range, int], start: int, stop: int) -> Union[range, int]:
+    return stop - start if isinstance(piece, int) else piece[start:stop]
+
+
+def _add_piece(pieces: List[Union[range, int]], piece: Union[range, int]) -> None:
+    """Append a piece, merging it into the last one when both are runs of new lines."""
+    if isinstance(piece, int):
+        if not piece:
+            return
+        if pieces and isinstance(pieces[-1], int):
+            pieces[-1] += piece
+            return
+    pieces.append(piece)
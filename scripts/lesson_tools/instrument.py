@@ -0,0 +1,181 @@
+"""
+Optional instrumentation for the content stages.
+
+Transforms mark their hot functions with `timed` and count rule branches with
+`hit`. Both are no-ops unless a `recording()` is active, which the runner
+starts around each file when a report is requested (--report), so the normal
+path pays one global lookup per call. The runner attaches each file's
+`FileMetrics` to its result and `Report` aggregates them into a JSON or CSV
+report with the slowest files first.
+"""
+
+import csv
+import functools
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, TextIO, TypeVar
+
+F = TypeVar('F', bound=Callable)
+
+
+@dataclass
+class FileMetrics:
+    """What one file cost: wall time, bytes, and per-function/per-rule counts."""
+    seconds: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    # Seconds and call counts per timed function or stage ('stage:<name>')
+    timings: Dict[str, float] = field(default_factory=dict)
+    calls: Dict[str, int] = field(default_factory=dict)
+    # How many times each rule fired
+    hits: Dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+class _Recorder:
+    __slots__ = ('timings', 'calls', 'hits')
+
+    def __init__(self):
+        self.timings = Counter()
+        self.calls = Counter()
+        self.hits = Counter()
+
+
+_recorder: Optional[_Recorder] = None
+
+
+def hit(rule: str, count: int = 1) -> None:
+    """Count a rule firing, if recording."""
+    if _recorder is not None:
+        _recorder.hits[rule] += count
+
+
+@contextmanager
+def timer(name: str) -> Iterator[None]:
+    """Time the enclosed block under `name`, if recording."""
+    recorder = _recorder
+    if recorder is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.timings[name] += time.perf_counter() - start
+        recorder.calls[name] += 1
+
+
+def timed(func: F) -> F:
+    """Decorator: time every call of func under its name, if recording."""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        recorder = _recorder
+        if recorder is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            recorder.timings[name] += time.perf_counter() - start
+            recorder.calls[name] += 1
+
+    return wrapper
+
+
+@contextmanager
+def recording() -> Iterator[FileMetrics]:
+    """Record everything inside the block into the yielded FileMetrics.
+
+    The caller fills in bytes and error; timings, calls, hits and the total
+    wall time are filled in when the block exits.
+    """
+    global _recorder
+    previous, _recorder = _recorder, _Recorder()
+    metrics = FileMetrics()
+    start = time.perf_counter()
+    try:
+        yield metrics
+    finally:
+        recorder, _recorder = _recorder, previous
+        metrics.seconds = time.perf_counter() - start
+        metrics.timings = dict(recorder.timings)
+        metrics.calls = dict(recorder.calls)
+        metrics.hits = dict(recorder.hits)
+
+
+class Report:
+    """Per-file metrics for one run, written as JSON or CSV."""
+
+    def __init__(self):
+        self.files: List[dict] = []
+
+    def add(self, path: Path, metrics: FileMetrics, modified: bool, stages: List[str]) -> None:
+        self.files.append({'path': str(path), 'modified': modified, 'stages': stages, **asdict(metrics)})
+
+    def slowest(self, top: int) -> List[dict]:
+        return sorted(self.files, key=lambda entry: entry['seconds'], reverse=True)[:top]
+
+    def totals(self) -> dict:
+        timings, calls, hits = Counter(), Counter(), Counter()
+        for entry in self.files:
+            timings.update(entry['timings'])
+            calls.update(entry['calls'])
+            hits.update(entry['hits'])
+        return {
+            'files': len(self.files),
+            'modified': sum(entry['modified'] for entry in self.files),
+            'errors': sum(entry['error'] is not None for entry in self.files),
+            'seconds': sum(entry['seconds'] for entry in self.files),
+            'bytes_in': sum(entry['bytes_in'] for entry in self.files),
+            'bytes_out': sum(entry['bytes_out'] for entry in self.files),
+            'timings': dict(timings.most_common()),
+            'calls': dict(calls),
+            'hits': dict(sorted(hits.items())),
+        }
+
+    def write(self, path: Path, top: int) -> None:
+        """Write JSON, or CSV (one row per file, slowest first) if path ends in .csv."""
+        if path.suffix.lower() == '.csv':
+            self._write_csv(path)
+            return
+        report = {'totals': self.totals(), 'slowest': self.slowest(top), 'files': self.files}
+        path.write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+
+    def _write_csv(self, path: Path) -> None:
+        timing_names = sorted({name for entry in self.files for name in entry['timings']})
+        rule_names = sorted({rule for entry in self.files for rule in entry['hits']})
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['path', 'seconds', 'bytes_in', 'bytes_out', 'modified', 'stages', 'error']
+                            + [f"seconds:{name}" for name in timing_names]
+                            + [f"calls:{name}" for name in timing_names]
+                            + [f"hits:{rule}" for rule in rule_names])
+            for entry in self.slowest(len(self.files)):
+                writer.writerow(
+                    [entry['path'], f"{entry['seconds']:.6f}", entry['bytes_in'], entry['bytes_out'],
+                     int(entry['modified']), '+'.join(entry['stages']), entry['error'] or '']
+                    + [f"{entry['timings'].get(name, 0.0):.6f}" for name in timing_names]
+                    + [entry['calls'].get(name, 0) for name in timing_names]
+                    + [entry['hits'].get(rule, 0) for rule in rule_names]
+                )
+
+    def print_summary(self, out: TextIO, top: int) -> None:
+        totals = self.totals()
+        print(f"\nSlowest {min(top, len(self.files))} of {totals['files']} files "
+              f"({totals['seconds']:.3f}s in total):", file=out)
+        for entry in self.slowest(top):
+            print(f"  {entry['seconds'] * 1000:8.1f} ms  {entry['path']}", file=out)
+        if totals['timings']:
+            print("Time by function:", file=out)
+            for name, seconds in totals['timings'].items():
+                print(f"  {seconds * 1000:8.1f} ms  {name} ({totals['calls'][name]} calls)", file=out)
+        if totals['hits']:
+            print("Rule hits:", file=out)
+            for rule, count in totals['hits'].items():
+                print(f"  {count:8d}  {rule}", file=out)
@@ -0,0 +1,166 @@
+"""
+Optimal splitting of long text into bullets, by dynamic programming over break points.
+
+`split_long_bullet` tries its split patterns one after another and keeps the
+first that works, dropping pieces outside its length bounds and truncating
+when none does. `split_text` instead finds every allowed break point in one
+regex pass, each with a penalty for how poor a place to break it is
+(a semicolon or sentence end is best, a bare space is the last resort), and
+picks the set of breaks that keeps every piece within the limit at the lowest
+total cost: the squared slack of each piece (so pieces come out balanced
+rather than one full and one stub) plus the penalties of the breaks used.
+Bare spaces are only considered when the text cannot be split at
+punctuation or conjunctions at all, which also keeps the common case to a
+handful of candidates.
+
+Pieces are slices of the original text, so nothing is lost but the
+punctuation a break consumes (the semicolon or comma it sits on). A piece can
+only start at a break that lies within `max_length` of its end, so the search
+is linear in the length of the text for a fixed limit. `split_at` instead
+cuts text where another splitter's pieces end, so a split that splitter
+already makes cleanly can be kept as it is.
+"""
+
+import re
+from itertools import accumulate
+from typing import List, Optional, Sequence, Tuple
+
+MIN_PIECE_LENGTH = 20  # like split_long_bullet, avoid leaving fragments shorter than this
+
+_BREAKS = r"""
+    (?P<semicolon>\s*;\s+)
+  | (?<=[.!?])(?P<sentence>\s+)(?=[A-Z])
+  | (?P<comma_conjunction>,\s+)(?=(?i:and|whilst|while|also|additionally|furthermore|moreover)\s)
+  | (?P<comma>,\s+)
+  | (?P<conjunction>\s+)(?=(?i:and|whilst|while|also)\s)
+"""
+# The leading lookahead lets every other character fail on one test
+BREAK = re.compile(r"(?=[\s,;])(?:" + _BREAKS + ")", re.VERBOSE)
+
+# In the same units as the squared slack of a piece, (max_length - length) ** 2
+PENALTIES = {
+    'semicolon': 0,
+    'sentence': 0,
+    'comma_conjunction': 200,
+    'comma': 800,
+    'conjunction': 1500,
+}
+SPACE_PENALTY = 5000
+
+# A conjunction a break sits before, which split_long_bullet drops from the next piece
+_CONJUNCTION = re.compile(r"(?i:and|whilst|while|also|additionally|furthermore|moreover)\s+")
+
+# Never break inside parentheses, link text or inline code
+PROTECTED = re.compile(r"\([^()]*\)|\[[^\]]*\]|`[^`]*`")
+
+# (where the piece before the break ends, where the piece after it starts, penalty)
+Break = Tuple[int, int, int]
+
+
+def break_points(text: str, spaces: bool = False) -> List[Break]:
+    """Every place text may be split, in order, scored once; with `spaces`, every space too."""
+    breaks = [(m.start(), m.end(), PENALTIES[m.lastgroup]) for m in BREAK.finditer(text)]
+    if spaces:
+        # Word ends from the word lengths, without a match object per space
+        words = text.split(' ')
+        ends = accumulate(len(word) + 1 for word in words[:-1])
+        breaks += [(end - 1, end, SPACE_PENALTY) for end in ends]
+        breaks.sort()
+    protected = [m.span() for m in PROTECTED.finditer(text)]
+    if protected:
+        # Both lists are in order, so one merge-like sweep drops the breaks inside a span
+        kept = []
+        spans = iter(protected)
+        span_start, span_end = next(spans)
+        for brk in breaks:
+            while brk[0] >= span_end:
+                span_start, span_end = next(spans, (len(text) + 1, len(text) + 1))
+            if brk[0] <= span_start:
+                kept.append(brk)
+        breaks = kept
+    return breaks
+
+
+def split_text(text: str, max_length: int, min_length: int = MIN_PIECE_LENGTH) -> Optional[List[str]]:
+    """The lowest-cost split of text into pieces of min_length..max_length characters.
+
+    Returns [text] if it already fits, and None if no split satisfies the
+    bounds (e.g. a run of more than max_length characters without a space).
+    """
+    text = text.strip()
+    if len(text) <= max_length:
+        return [text]
+    pieces = _best_split(text, break_points(text), max_length, min_length)
+    if pieces is None:
+        pieces = _best_split(text, break_points(text, spaces=True), max_length, min_length)
+    return pieces
+
+
+def split_at(text: str, pieces: Sequence[str], max_length: int,
+             min_length: int = MIN_PIECE_LENGTH) -> Optional[List[str]]:
+    """text cut where each of pieces ends, the way split_text cuts it at those breaks.
+
+    `pieces` are text split by another splitter, which may have dropped the
+    conjunction after a break. Returns None unless each of them but the last
+    ends at one of break_points and every cut piece is within the bounds.
+    """
+    text = text.strip()
+    # Where the piece after each break starts, by where the piece before it ends
+    after = {end: start for end, start, _ in reversed(break_points(text))}
+    cut = []
+    start = position = 0
+    for piece in pieces:
+        if not text.startswith(piece, position):
+            dropped = _CONJUNCTION.match(text, position)
+            if dropped is None or not text.startswith(piece, dropped.end()):
+                return None
+            position = dropped.end()
+        end = position + len(piece)
+        if end == len(text):
+            cut.append(text[start:])
+            break
+        if end not in after:
+            return None
+        cut.append(text[start:end])
+        start = position = after[end]
+    else:
+        return None
+    if len(cut) != len(pieces) or any(not min_length <= len(piece) <= max_length for piece in cut):
+        return None
+    return cut
+
+
+def _best_split(text: str, breaks: List[Break], max_length: int, min_length: int) -> Optional[List[str]]:
+    # Node 0 is the start of the text, node k the k-th break, the last node its end
+    ends = [end for end, _, _ in breaks] + [len(text)]
+    starts = [0] + [start for _, start, _ in breaks]
+    penalties = [penalty for _, _, penalty in breaks] + [0]
+    infinity = float('inf')
+    cost = [0.0] + [infinity] * len(ends)
+    previous = [-1] * (len(ends) + 1)
+    # Pieces ending at `end` can start at nodes first..last-1: both only move forward
+    first = last = 0
+    for j, end in enumerate(ends, 1):
+        while first < j and end - starts[first] > max_length:
+            first += 1
+        while last < j and end - starts[last] >= min_length:
+            last += 1
+        best, best_i = infinity, -1
+        slack = max_length - end
+        for i in range(first, last):
+            total = cost[i] + (slack + starts[i]) ** 2
+            if total < best:
+                best, best_i = total, i
+        cost[j] = best + penalties[j - 1]
+        previous[j] = best_i
+    if cost[-1] == infinity:
+        return None
+
+    pieces = []
+    j = len(ends)
+    while j > 0:
+        i = previous[j]
+        pieces.append(text[starts[i]:ends[j - 1]])
+        j = i
+    pieces.reverse()
+    return pieces
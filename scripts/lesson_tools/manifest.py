@@ -0,0 +1,79 @@
+"""
+Persistent record of the lessons each transform has already processed.
+
+For every transform the manifest stores, per file, the size, mtime, content hash
+and transform version seen after its last run. Transforms are keyed by pipeline
+name (e.g. 'convert' or 'convert+refine+case'). A file whose size and mtime still
+match is skipped without being read; one whose stat changed but whose bytes hash
+the same is skipped without being decoded.
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+DEFAULT_MANIFEST = Path('.content-manifest.json')
+MANIFEST_FORMAT = 1
+
+
+@dataclass
+class FileState:
+    """What a file looked like after a transform last processed it."""
+    size: int
+    mtime_ns: int
+    sha256: str
+    version: str
+
+    def matches_stat(self, stat: os.stat_result, version: str) -> bool:
+        return (
+            self.version == version
+            and self.size == stat.st_size
+            and self.mtime_ns == stat.st_mtime_ns
+        )
+
+
+class Manifest:
+    """File states keyed by transform name, then by file path."""
+
+    def __init__(self, path: Path, transforms: Optional[Dict[str, Dict[str, FileState]]] = None):
+        self.path = path
+        self.transforms = transforms if transforms is not None else {}
+
+    @classmethod
+    def load(cls, path: Path) -> 'Manifest':
+        """Load a manifest, starting empty if it is missing or from another format."""
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return cls(path)
+        if data.get('format') != MANIFEST_FORMAT:
+            return cls(path)
+        transforms = {
+            name: {file: FileState(**state) for file, state in files.items()}
+            for name, files in data.get('transforms', {}).items()
+        }
+        return cls(path, transforms)
+
+    def get(self, transform: str, file_path: Path) -> Optional[FileState]:
+        return self.transforms.get(transform, {}).get(str(file_path))
+
+    def set(self, transform: str, file_path: Path, state: FileState) -> None:
+        self.transforms.setdefault(transform, {})[str(file_path)] = state
+
+    def discard(self, transform: str, file_path: Path) -> None:
+        self.transforms.get(transform, {}).pop(str(file_path), None)
+
+    def save(self) -> None:
+        """Write the manifest atomically next to its final location."""
+        data = {
+            'format': MANIFEST_FORMAT,
+            'transforms': {
+                name: {file: asdict(state) for file, state in sorted(files.items())}
+                for name, files in sorted(self.transforms.items())
+            },
+        }
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        tmp_path.write_text(json.dumps(data, indent=1) + '\n', encoding='utf-8')
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,182 @@
+"""
+Memoization for the pure text transforms (paragraph_to_bullets, split_long_bullet).
+
+Lessons across tracks and localized copies repeat the same paragraphs and
+bullets, so `cached` functions keep an in-process LRU keyed by their input
+text. With --cache the LRU is backed by an SQLite file keyed by a hash of the
+function name, its transform version and the input, shared across files,
+worker processes and runs. The file is bounded to --cache-size entries, least
+recently used first out.
+"""
+
+import functools
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from . import instrument
+
+DEFAULT_CACHE = Path('.content-cache.sqlite')
+DEFAULT_CACHE_SIZE = 100_000
+LRU_SIZE = 4096
+FLUSH_EVERY = 1000  # pending writes and hits batched per transaction
+
+
+class DiskCache:
+    """Entries of (key, JSON value, last used) in one SQLite table.
+
+    The table is read into memory on first use, so a lookup is a dict probe;
+    new entries and hits are written back in batches.
+    """
+
+    def __init__(self, path: Path, max_entries: int = DEFAULT_CACHE_SIZE):
+        # Only runs with --cache need these
+        import hashlib
+        import sqlite3
+
+        self.sha256 = hashlib.sha256
+        self.path = path
+        self.max_entries = max_entries
+        self.pid = os.getpid()
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, used REAL NOT NULL)'
+        )
+        self.connection.commit()
+        self.entries: Optional[Dict[str, str]] = None
+        self.pending: List[Tuple[str, str]] = []
+        self.touched: Set[str] = set()
+
+    def key(self, name: str, version: int, text: str) -> str:
+        return self.sha256(f"{name}@{version}\0{text}".encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[list]:
+        if self.entries is None:
+            import sqlite3
+            try:
+                self.entries = dict(self.connection.execute('SELECT key, value FROM entries'))
+            except sqlite3.Error:
+                self.entries = {}  # the cache is best-effort; recompute
+        value = self.entries.get(key)
+        if value is None:
+            return None
+        self.touched.add(key)
+        return json.loads(value)
+
+    def put(self, key: str, value: list) -> None:
+        encoded = json.dumps(value)
+        if self.entries is not None:
+            self.entries[key] = encoded
+        self.pending.append((key, encoded))
+
+    def flush(self, force: bool = True) -> None:
+        """Write new entries, mark hits as recently used and evict past max_entries.
+
+        Without `force` nothing is written until FLUSH_EVERY changes are queued.
+        """
+        if not force and len(self.pending) + len(self.touched) < FLUSH_EVERY:
+            return
+        if not self.pending and not self.touched:
+            return
+        import sqlite3
+        now = time.time()
+        try:
+            self._write(now)
+        except sqlite3.Error:
+            pass  # e.g. locked for too long by another process; these entries are just lost
+        self.pending.clear()
+        self.touched.clear()
+
+    def _write(self, now: float) -> None:
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO entries (key, value, used) VALUES (?, ?, ?)',
+                [(key, value, now) for key, value in self.pending],
+            )
+            self.connection.executemany('UPDATE entries SET used = ? WHERE key = ?',
+                                        [(now, key) for key in self.touched])
+            if self.pending:
+                (count,) = self.connection.execute('SELECT COUNT(*) FROM entries').fetchone()
+                if count > self.max_entries:
+                    self.connection.execute(
+                        'DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY used LIMIT ?)',
+                        (count - self.max_entries,),
+                    )
+
+
+_disk: Optional[DiskCache] = None
+
+
+def configure(path: Optional[Path], max_entries: int = DEFAULT_CACHE_SIZE) -> None:
+    """Back cached functions with the SQLite file at path (None: in-process only)."""
+    global _disk
+    if _disk is not None and _disk.pid != os.getpid():
+        _disk = None  # inherited across fork; a connection must not be shared
+    if _disk is not None and path is not None and _disk.path == path:
+        _disk.max_entries = max_entries
+        return
+    flush()
+    _disk = DiskCache(path, max_entries) if path is not None else None
+
+
+def flush(force: bool = True) -> None:
+    """Save queued cache entries; see DiskCache.flush."""
+    if _disk is not None and _disk.pid == os.getpid():
+        _disk.flush(force)
+
+
+# The in-process LRU of every cached function
+_lrus: List['OrderedDict[str, Tuple[str, ...]]'] = []
+
+
+def clear() -> None:
+    """Empty the in-process caches of every cached function (the disk cache is left alone)."""
+    for lru in _lrus:
+        lru.clear()
+
+
+def cached(version: int) -> Callable[[Callable[[str], List[str]]], Callable[[str], List[str]]]:
+    """Decorator for a function from text to a list of strings that depends on nothing else.
+
+    `version` is the transform version of the function's script; bumping it
+    invalidates the function's disk entries.
+    """
+    def decorate(func: Callable[[str], List[str]]) -> Callable[[str], List[str]]:
+        name = func.__name__
+        lru: 'OrderedDict[str, Tuple[str, ...]]' = OrderedDict()
+
+        @functools.wraps(func)
+        def wrapper(text: str) -> List[str]:
+            value = lru.get(text)
+            if value is not None:
+                lru.move_to_end(text)
+                instrument.hit(f"cache.{name}")
+                return list(value)
+
+            key = None
+            result = None
+            if _disk is not None:
+                key = _disk.key(name, version, text)
+                result = _disk.get(key)
+                if result is not None:
+                    instrument.hit(f"cache.{name}")
+            if result is None:
+                result = func(text)
+                if key is not None:
+                    _disk.put(key, result)
+
+            lru[text] = tuple(result)
+            if len(lru) > LRU_SIZE:
+                lru.popitem(last=False)
+            return list(result)
+
+        wrapper.cache_clear = lru.clear
+        _lrus.append(lru)
+        return wrapper
+
+    return decorate
@@ -0,0 +1,115 @@
+"""
+MinHash signatures and LSH banding, for finding near-duplicate bullets.
+
+A bullet is reduced to the set of hashed character shingles of its normalized
+text. Its signature is a one-permutation MinHash: every shingle hash is hashed
+once into one of NUM_BINS bins and each bin keeps its minimum, with empty bins
+filled from their nearest non-empty neighbour (rotation densification). That
+costs one pass over the shingles rather than one per hash function, and two
+signatures still agree in a bin with probability close to the sets' Jaccard
+similarity. `LSHIndex` buckets signatures band by band, so only texts that
+collide in at least one band are ever compared, and indexing a corpus stays
+roughly linear in its size.
+"""
+
+import math
+import operator
+import re
+import zlib
+from collections import Counter
+from typing import Dict, FrozenSet, Hashable, List, Sequence, Set, Tuple
+
+SHINGLE_SIZE = 5
+NUM_BINS = 64
+ROWS = 4  # signature bins per LSH band
+# Compare a new text with at most this many earlier texts per bucket, so a
+# bucket of thousands of variants of one phrase cannot go quadratic
+MAX_BUCKET_COMPARISONS = 32
+# Acceptable chance of missing a pair right at the similarity threshold
+MISS_RATE = 0.01
+
+_MARKUP = re.compile(r"[`*_~\[\]()]")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_EMPTY = 1 << 32
+_BIN_SHIFT = NUM_BINS.bit_length() - 1
+
+
+def normalize(text: str) -> str:
+    """Lowercase text with markdown markup and punctuation collapsed to single spaces."""
+    return _NON_WORD.sub(' ', _MARKUP.sub('', text.lower())).strip()
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> FrozenSet[int]:
+    """CRC-32 hashes of the overlapping `size`-byte pieces of normalized text."""
+    data = normalize(text).encode('utf-8')
+    if len(data) <= size:
+        return frozenset([zlib.crc32(data)]) if data else frozenset()
+    return frozenset(map(zlib.crc32, {data[i:i + size] for i in range(len(data) - size + 1)}))
+
+
+def signature(hashes: Set[int]) -> Tuple[int, ...]:
+    """One-permutation MinHash of a set of 32-bit hashes, NUM_BINS values long."""
+    # The low bits pick the bin, the rest are the value; visiting the hashes
+    # largest first leaves each bin holding its smallest
+    mask = NUM_BINS - 1
+    lowest = {h & mask: h >> _BIN_SHIFT for h in sorted(hashes, reverse=True)}
+    bins = [lowest.get(b, _EMPTY) for b in range(NUM_BINS)]
+    if len(lowest) < NUM_BINS and lowest:
+        # Each empty bin borrows the next non-empty bin's value, offset by the
+        # distance so borrowed values never match genuine ones by accident
+        for b in range(NUM_BINS):
+            if bins[b] == _EMPTY:
+                distance = 1
+                while bins[(b + distance) % NUM_BINS] >= _EMPTY:
+                    distance += 1
+                bins[b] = bins[(b + distance) % NUM_BINS] + distance * _EMPTY
+    return tuple(bins)
+
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    if not a and not b:
+        return 1.0
+    common = len(a & b)
+    return common / (len(a) + len(b) - common)
+
+
+def estimate(a: Sequence[int], b: Sequence[int]) -> float:
+    """Jaccard similarity estimated from two signatures: the share of bins that agree."""
+    return sum(map(operator.eq, a, b)) / len(a)
+
+
+def min_collisions(threshold: float, bands: int = NUM_BINS // ROWS, rows: int = ROWS) -> int:
+    """How many bands a pair at `threshold` shares, at least, but for MISS_RATE of the time.
+
+    Two texts collide in a band with probability threshold ** rows, so the
+    count is binomial; requiring more than one shared band prunes most of the
+    chance collisions at high thresholds.
+    """
+    p = threshold ** rows
+    below = 0.0
+    for k in range(bands + 1):
+        below += math.comb(bands, k) * p ** k * (1 - p) ** (bands - k)
+        if below > MISS_RATE:
+            return max(1, k)
+    return bands
+
+
+class LSHIndex:
+    """Signatures bucketed by band; `add` counts the bands each earlier key shares."""
+
+    def __init__(self, rows: int = ROWS):
+        self.rows = rows
+        self.buckets: Dict[int, List[Hashable]] = {}
+
+    def add(self, key: Hashable, sig: Sequence[int]) -> Counter:
+        candidates = Counter()
+        rows = self.rows
+        for start in range(0, len(sig), rows):
+            bucket_key = hash((start, *sig[start:start + rows]))
+            bucket = self.buckets.get(bucket_key)
+            if bucket is None:
+                self.buckets[bucket_key] = [key]
+                continue
+            candidates.update(bucket[-MAX_BUCKET_COMPARISONS:])
+            bucket.append(key)
+        return candidates
@@ -0,0 +1,139 @@
+"""
+Compact read-only lesson model for corpus-wide scans.
+
+LessonDocument splits a lesson into one string per line so scripts can edit
+it. Passes that only read (near-duplicate detection, checks, indexing) over
+tens of thousands of lessons don't need that: a `Lesson` keeps its text as the
+single source string, with line offsets and heading lines in compact arrays,
+and `Section` and `Bullet` are `__slots__` objects holding integers into it.
+Text is only sliced out when a caller asks for it, so holding a corpus costs
+little more than the text itself.
+
+Sections and bullets follow LessonDocument: a heading is a line starting with
+'##', a section's `end` is the next heading of any depth and its `outer_end`
+the next level-2 heading, and a bullet is a line starting with '- '.
+"""
+
+import re
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from .document import LessonDocument, heading_level
+from .rules import HEADING_RULES
+
+_NEWLINE = re.compile('\n')
+
+
+class Lesson:
+    """A lesson's text, with its line starts and heading lines as offsets."""
+
+    __slots__ = ('path', 'text', 'starts', 'headings')
+
+    def __init__(self, text: str, path: Optional[Path] = None):
+        self.path = path
+        self.text = text
+        # starts[i] is where line i begins; the extra last entry is len(text) + 1.
+        # Taken from the newline positions, so the lines are never split out
+        starts = array('I', [0])
+        starts.extend(match.end() for match in _NEWLINE.finditer(text))
+        starts.append(len(text) + 1)
+        self.starts = starts
+        self.headings = array('I', (index for index, _ in HEADING_RULES.scan(text)))
+
+    @classmethod
+    def read(cls, path: Path) -> 'Lesson':
+        return cls(path.read_text(encoding='utf-8'), path)
+
+    def __len__(self) -> int:
+        """The number of lines."""
+        return len(self.starts) - 1
+
+    def line(self, index: int) -> str:
+        return self.text[self.starts[index]:self.starts[index + 1] - 1]
+
+    def line_startswith(self, index: int, prefix: str) -> bool:
+        """line(index).startswith(prefix), without slicing the line out."""
+        return self.text.startswith(prefix, self.starts[index], self.starts[index + 1] - 1)
+
+    def line_equals(self, index: int, value: str) -> bool:
+        start = self.starts[index]
+        return self.starts[index + 1] - 1 - start == len(value) and self.text.startswith(value, start)
+
+    def document(self) -> LessonDocument:
+        """An editable LessonDocument of the same text."""
+        return LessonDocument(self.text)
+
+    def _section_at(self, position: int) -> 'Section':
+        headings = self.headings
+        end = headings[position + 1] if position + 1 < len(headings) else len(self)
+        outer_end = len(self)
+        for index in headings[position + 1:]:
+            if not self.line_startswith(index, '###'):
+                outer_end = index
+                break
+        return Section(self, headings[position], end, outer_end)
+
+    def sections(self) -> Iterator['Section']:
+        """Yield a section for every '##'/'###' heading, in document order."""
+        for position, index in enumerate(self.headings):
+            if not self.line_startswith(index, '####'):
+                yield self._section_at(position)
+
+    def iter_sections(self, titles: Iterable[str], level: int = 2) -> Iterator['Section']:
+        """Yield every section whose heading is exactly '<#s> <title>'."""
+        prefix = '#' * level + ' '
+        wanted = [prefix + title for title in titles]
+        for position, index in enumerate(self.headings):
+            if any(self.line_equals(index, line) for line in wanted):
+                yield self._section_at(position)
+
+    def find_section(self, title: str, level: int = 2) -> Optional['Section']:
+        """Return the first section titled `title`, or None."""
+        return next(self.iter_sections([title], level), None)
+
+
+class Section:
+    """A heading line and the line ranges its body covers, as in LessonDocument."""
+
+    __slots__ = ('lesson', 'start', 'end', 'outer_end')
+
+    def __init__(self, lesson: Lesson, start: int, end: int, outer_end: int):
+        self.lesson = lesson
+        self.start = start
+        self.end = end
+        self.outer_end = outer_end
+
+    @property
+    def level(self) -> int:
+        return heading_level(self.lesson.line(self.start))
+
+    @property
+    def title(self) -> str:
+        return self.lesson.line(self.start)[self.level:].strip()
+
+    def bullets(self, subsections: bool = True) -> Iterator['Bullet']:
+        """Yield the bullets of the body, including '###' subsections unless told not to."""
+        lesson = self.lesson
+        for index in range(self.start + 1, self.outer_end if subsections else self.end):
+            if lesson.line_startswith(index, '- '):
+                yield Bullet(lesson, index)
+
+
+class Bullet:
+    """A '- ' line of a lesson."""
+
+    __slots__ = ('lesson', 'index')
+
+    def __init__(self, lesson: Lesson, index: int):
+        self.lesson = lesson
+        self.index = index
+
+    @property
+    def text(self) -> str:
+        """The bullet without its '- ' marker or surrounding whitespace."""
+        starts = self.lesson.starts
+        return self.lesson.text[starts[self.index] + 2:starts[self.index + 1] - 1].strip()
+
+    def __repr__(self) -> str:
+        return f"Bullet(line={self.index + 1}, text={self.text!r})"
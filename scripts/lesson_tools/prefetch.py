@@ -0,0 +1,102 @@
+"""
+Asyncio I/O front end for sequential runs (--prefetch).
+
+Up to `depth` lessons are in flight at once: their reads are issued ahead on
+an I/O thread pool, the transforms run one at a time on the event loop
+thread, and finished lessons are written back on the pool while the next ones
+are transformed. Results still come out in input order, and the window bounds
+how many files are held in memory. This hides storage latency (e.g. a network
+mounted content volume) behind the regex work.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from typing import AsyncIterator, Iterator, List, Optional, Sequence, Tuple
+
+from . import instrument, memo
+from .manifest import FileState
+from .runner import (
+    FileResult, RunOptions, failed_lesson, process_lesson, should_stream, store_lesson, transform_lesson,
+)
+from .stages import Stage
+
+
+def _read(file_path: Path, stages: Sequence[Stage], options: RunOptions) -> Tuple[os.stat_result, Optional[bytes]]:
+    stat = file_path.stat()
+    if should_stream(stat, stages, options):
+        return stat, None
+    return stat, file_path.read_bytes()
+
+
+async def _process(file_path: Path, known: Optional[FileState], stages: Sequence[Stage],
+                   options: RunOptions, io: ThreadPoolExecutor) -> FileResult:
+    loop = asyncio.get_running_loop()
+    metrics = None
+    try:
+        start = time.perf_counter()
+        stat, data = await loop.run_in_executor(io, _read, file_path, stages, options)
+        read_seconds = time.perf_counter() - start
+        if data is None:
+            # Too large to hold in memory: stream it here, without overlap
+            return process_lesson(file_path, stages, known, options)
+
+        with instrument.recording() if options.instrument else nullcontext() as metrics:
+            result, data = transform_lesson(file_path, stat, data, stages, known, options, metrics)
+        if metrics is not None:
+            metrics.timings['read'] = read_seconds
+            metrics.calls['read'] = 1
+            metrics.seconds += read_seconds
+        if data is not None:
+            start = time.perf_counter()
+            result = await loop.run_in_executor(io, store_lesson, result, stat, data, options)
+            if metrics is not None:
+                metrics.timings['write'] = time.perf_counter() - start
+                metrics.calls['write'] = 1
+                metrics.seconds += metrics.timings['write']
+    except Exception as e:
+        result = failed_lesson(file_path, e, metrics)
+    result.metrics = metrics
+    memo.flush(force=False)
+    return result
+
+
+async def _pipeline(files: List[Path], known: List[Optional[FileState]], stages: Sequence[Stage],
+                    options: RunOptions, depth: int) -> AsyncIterator[FileResult]:
+    window = deque()
+    with ThreadPoolExecutor(max_workers=depth, thread_name_prefix='lesson-io') as io:
+        try:
+            for file_path, state in zip(files, known):
+                window.append(asyncio.ensure_future(_process(file_path, state, stages, options, io)))
+                if len(window) >= depth:
+                    yield await window.popleft()
+            while window:
+                yield await window.popleft()
+        finally:
+            # Stopped early: abandon lessons not yet transformed, but let
+            # writes already handed to the pool finish (the executor waits)
+            for task in window:
+                task.cancel()
+            await asyncio.gather(*window, return_exceptions=True)
+
+
+def prefetch_map(files: List[Path], known: List[Optional[FileState]], stages: Sequence[Stage],
+                 options: RunOptions, depth: int) -> Iterator[FileResult]:
+    """Yield a FileResult per file, in order, with up to `depth` files' I/O in flight."""
+    for stage in stages:
+        stage.module  # import the scripts before the first read is timed
+    loop = asyncio.new_event_loop()
+    results = _pipeline(files, known, stages, options, depth)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(results.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(results.aclose())
+        loop.close()
@@ -0,0 +1,164 @@
+"""
+Byte-level prefilter: skip lessons the stages would leave untouched.
+
+Most of the corpus is already normalized, yet every run used to decode each
+lesson, parse it into a LessonDocument and run every stage over it only to
+find nothing to do. The runner now memory-maps each lesson (`mapped`) and asks
+the stages first: a script may define `might_change(lesson) -> bool`, which
+gets the lesson's raw bytes as a `LessonBytes` and returns False only if its
+`transform_document` would certainly return False. The scripts answer from a
+byte search for the target headings and the Quick Summary marker, decoding
+only the bodies of the target sections (`LessonBytes.section_bodies`); the
+headings are found once per lesson however many stages ask. A stage without
+`might_change` is always run.
+
+A lesson is only skipped when no stage would change it as it stands. Since a
+stage that changes nothing leaves the document as it found it, every later
+stage then sees the same bytes, so asking each stage about the original is
+exact. A skipped lesson is still checked to be valid UTF-8 (`is_utf8`), so
+one that is not is reported as an error just as before.
+"""
+
+import codecs
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Collection, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .stages import Stage
+
+# A lesson's bytes: bytes, or an mmap of the file
+Data = Union[bytes, 'mmap.mmap']
+
+TARGET_TITLES = ("What You'll Learn", "Key Takeaways")
+
+# Starts with a literal so the regex engine can skip ahead; the line start is checked by hand
+_TARGET_HEADING = re.compile(
+    b"## (" + b'|'.join(re.escape(title.encode('utf-8')) for title in TARGET_TITLES) + rb")(?=[\r\n]|\Z)")
+UTF8_CHUNK = 1 << 20
+
+
+@contextmanager
+def mapped(file_path: Path) -> Iterator[Data]:
+    """The bytes of a file, memory-mapped read-only for as long as the block runs.
+
+    An empty file (which cannot be mapped) or one on a filesystem without mmap
+    support is read into memory instead.
+    """
+    import mmap
+    with open(file_path, 'rb') as file:
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            data = None
+        if data is None:
+            yield file.read()
+            return
+        try:
+            yield data
+        finally:
+            data.close()
+
+
+def _next_heading(data: Data, start: int, level_2: bool) -> int:
+    """Offset of the line break before the next line from start that starts with '##', or -1.
+
+    With `level_2` only level-2 headings count (Section.outer_end), otherwise
+    any line starting with '##' does (Section.end).
+    """
+    found = -1
+    # A bare '\r' breaks lines too, as in decode_lesson; it is only looked for before the first '\n' match
+    for newline in (b'\n', b'\r'):
+        stop = found if found != -1 else len(data)
+        end = data.find(newline + b'##', start, stop)
+        while end != -1 and level_2 and data[end + 3:end + 4] == b'#':
+            end = data.find(newline + b'##', end + 3, stop)
+        if end != -1:
+            found = end
+    return found
+
+
+class LessonBytes:
+    """A lesson's undecoded bytes, with its target sections found once for all the stages asking."""
+
+    def __init__(self, data: Data):
+        self.data = data
+        self._headings: Optional[List[Tuple[str, int]]] = None
+        self._bodies: Dict[Tuple[int, bool], List[str]] = {}
+
+    def contains(self, text: str) -> bool:
+        return self.data.find(text.encode('utf-8')) != -1
+
+    def headings(self) -> List[Tuple[str, int]]:
+        """(title, offset just past the heading) of every target heading line, in order.
+
+        A heading line is exactly '## <title>', as LessonDocument.iter_sections
+        matches it.
+        """
+        if self._headings is None:
+            data = self.data
+            self._headings = [
+                (match.group(1).decode('utf-8'), match.end())
+                for match in _TARGET_HEADING.finditer(data)
+                if match.start() == 0 or data[match.start() - 1] in b'\r\n'
+            ]
+        return self._headings
+
+    def has_section(self, title: str) -> bool:
+        return any(heading == title for heading, _ in self.headings())
+
+    def section_bodies(self, titles: Collection[str] = TARGET_TITLES,
+                       subsections: bool = True) -> Iterator[List[str]]:
+        """Yield the lines of the body of every '## <title>' section, in document order.
+
+        `titles` are some of TARGET_TITLES. The lines are what LessonDocument
+        would hold for them: decoded, with the runner's newline handling, up
+        to the next level-2 heading with `subsections` (Section.outer_end),
+        otherwise up to the next line starting with '##' (Section.end). They
+        are shared between callers, so must not be changed. A body that is
+        not valid UTF-8 raises UnicodeDecodeError.
+        """
+        for index, (title, start) in enumerate(self.headings()):
+            if title not in titles:
+                continue
+            body = self._bodies.get((index, subsections))
+            if body is None:
+                body = self._bodies[index, subsections] = self._read_body(start, subsections)
+            yield body
+
+    def _read_body(self, start: int, subsections: bool) -> List[str]:
+        data = self.data
+        end = _next_heading(data, start, subsections)
+        # From the heading's line break up to and including the next heading's
+        region = data[start:end + 1] if end != -1 else data[start:]
+        text = region.decode('utf-8')
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        lines = text.split('\n')
+        return lines[1:-1] if end != -1 else lines[1:]
+
+
+def is_utf8(data: Data) -> bool:
+    """True if data decodes as UTF-8, checked a chunk at a time so a large file's text is never held."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    view = memoryview(data)
+    try:
+        for start in range(0, len(view), UTF8_CHUNK):
+            decoder.decode(view[start:start + UTF8_CHUNK])
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return False
+    finally:
+        view.release()
+    return True
+
+
+def needs_work(data: Data, stages: Sequence[Stage]) -> bool:
+    """False if no stage would change the lesson in data, so it need not be parsed."""
+    lesson = LessonBytes(data)
+    try:
+        if any(stage.might_change(lesson) for stage in stages):
+            return True
+    except UnicodeDecodeError:
+        return True  # let the full run report it
+    return not is_utf8(data)
@@ -0,0 +1,101 @@
+"""
+Line rules for lessons, compiled into one matcher: `classify` names a line's
+rule with one match, and `scan` finds every line a rule matches in one pass.
+"""
+
+import re
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+QUICK_SUMMARY_MARKER = '> **Quick Summary:**'
+
+
+class Rule(NamedTuple):
+    """A line starting with a match of `pattern`."""
+    name: str
+    pattern: str
+
+
+class Marker(NamedTuple):
+    """A line containing `text`."""
+    name: str
+    text: str
+
+
+class RuleTable:
+    """Rules and markers compiled into one line matcher and one whole-text scanner.
+
+    Rules are tried in table order and the first that matches names the line;
+    a pattern matches at the start of a line, must not span lines and uses
+    only non-capturing groups. A marker can appear anywhere in a line:
+    `classify` tries markers after the rules, and `scan` reports them
+    alongside whichever rule also matched the line.
+    """
+
+    def __init__(self, rules: Iterable[Rule], markers: Sequence[Marker] = ()):
+        self.rules = tuple(rules)
+        self.markers = tuple(markers)
+        starts = '|'.join(f"(?P<{rule.name}>{rule.pattern})" for rule in self.rules)
+        anywhere = ''.join(f"|(?P<{marker.name}>.*?{re.escape(marker.text)})" for marker in self.markers)
+        self._line = re.compile(starts + anywhere if starts else anywhere[1:], re.MULTILINE)
+        # Line 0, then every later line found by searching for its newline first
+        self._first = re.compile(starts, re.MULTILINE) if starts else None
+        self._next = re.compile(f"\n(?:{starts})", re.MULTILINE) if starts else None
+
+    def only(self, *names: str) -> 'RuleTable':
+        """A table of just the named rules and markers, in this table's order."""
+        return RuleTable([rule for rule in self.rules if rule.name in names],
+                         [marker for marker in self.markers if marker.name in names])
+
+    def classify(self, line: str) -> Optional[str]:
+        """The name of the first rule the line matches, or None."""
+        match = self._line.match(line)
+        return match.lastgroup if match else None
+
+    def scan(self, text: str) -> List[Tuple[int, str]]:
+        """(line index, rule name) for every line of text a rule matches, in line order."""
+        found = []
+        if self._first is not None:
+            match = self._first.match(text)
+            if match:
+                found.append((0, match.lastgroup))
+            line = position = 0
+            for match in self._next.finditer(text):
+                start = match.start() + 1
+                line += text.count('\n', position, start)
+                position = start
+                found.append((line, match.lastgroup))
+        if self.markers:
+            count = len(found)
+            for name, marker in self.markers:
+                line = position = 0
+                start = text.find(marker)
+                while start != -1:
+                    line += text.count('\n', position, start)
+                    found.append((line, name))
+                    # Once per line: carry on from the next line
+                    position = text.find('\n', start)
+                    if position == -1:
+                        break
+                    start = text.find(marker, position)
+            if len(found) > count:
+                found.sort(key=lambda item: item[0])
+        return found
+
+
+LESSON_RULES = RuleTable([
+    Rule('frontmatter', r'---$'),
+    Rule('target_heading', r"## (?:What You'll Learn|Key Takeaways)$"),
+    Rule('heading', r'##'),
+    Rule('capital_bullet', r'- [A-Z]'),
+    Rule('bullet', r'- '),
+    Rule('indented_bullet', r'[^\S\n]+- '),
+], [
+    Marker('quick_summary', QUICK_SUMMARY_MARKER),
+])
+
+# A line starting with '- ', and any bullet line, indented or not (line.strip().startswith('- '))
+BULLETS = frozenset({'capital_bullet', 'bullet'})
+ANY_BULLETS = BULLETS | {'indented_bullet'}
+
+# Every line starting with '##', as LessonDocument.headings
+HEADING_RULES = LESSON_RULES.only('target_heading', 'heading')
@@ -0,0 +1,695 @@
+"""
+Run content stages over many lessons: each file is read, parsed and written at
+most once, with the options every script shares (see add_runner_arguments).
+"""
+
+import argparse
+import os
+import sys
+from collections import deque
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from . import instrument, memo
+from .document import LessonDocument
+from .instrument import FileMetrics, Report
+from .manifest import DEFAULT_MANIFEST, FileState, Manifest
+from .prefilter import mapped, needs_work
+from .splice import apply_edits, byte_edits
+from .stages import Stage, pipeline_name, pipeline_version
+from .streaming import StreamStatus, file_sha256, read_lines, write_lines
+from .shards import shard_spec
+from .transaction import StagedWrite, Transaction, TransactionError, new_temp_path, stage_write
+from .walk import ALL, Include, PathFilter, walk_markdown
+
+# difflib, hashlib, sqlite3, the process pool and git are imported
+# where they are used, so a run only pays for what it needs at startup
+
+
+@dataclass
+class FileResult:
+    """Outcome of running the stages over one file."""
+    path: Path
+    modified: bool = False
+    skipped: bool = False
+    error: Optional[str] = None
+    state: Optional[FileState] = None
+    # Names of the stages that changed the file, in the order they ran
+    stages: List[str] = field(default_factory=list)
+    # Unified diff of the change, with --diff
+    diff: Optional[str] = None
+    # Timings and rule hits, with --report
+    metrics: Optional[FileMetrics] = None
+    # The rewrite waiting to be committed, with --transaction
+    staged: Optional[StagedWrite] = None
+
+
+DEFAULT_STREAM_OVER = 8 * 1024 * 1024
+DEFAULT_INTERVAL = 0.25
+
+
+@dataclass(frozen=True)
+class RunOptions:
+    """Per-file settings the runner passes to every worker."""
+    # Manifest version of the stages; None when no manifest is in use
+    version: Optional[str] = None
+    write: bool = True
+    diff: bool = False
+    # Files of at least this many bytes are streamed when every stage can stream
+    stream_over: int = DEFAULT_STREAM_OVER
+    # Record FileMetrics for every file
+    instrument: bool = False
+    # SQLite file backing the transform caches (lesson_tools.memo)
+    cache: Optional[Path] = None
+    cache_size: int = memo.DEFAULT_CACHE_SIZE
+    # Stage rewrites for a Transaction instead of writing them in place
+    stage: bool = False
+
+
+def jobs_count(value: str) -> int:
+    """argparse type for --jobs: a positive worker count, or 0 for one per CPU."""
+    try:
+        jobs = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid job count: {value!r}")
+    if jobs < 0:
+        raise argparse.ArgumentTypeError("job count must be 0 or more")
+    return jobs or os.cpu_count() or 1
+
+
+def megabytes(value: str) -> int:
+    """argparse type for --stream-over: a size in MB, as bytes."""
+    try:
+        size = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {value!r}")
+    if size < 0:
+        raise argparse.ArgumentTypeError("size must be 0 or more")
+    return int(size * 1024 * 1024)
+
+
+def add_selection_arguments(parser: argparse.ArgumentParser, verb: str = 'process', since: bool = True) -> None:
+    """Add --exclude, and with `since` --since: the options select_files and file_filter read."""
+    if since:
+        parser.add_argument(
+            '--since', metavar='REF',
+            help=f"only {verb} lessons git reports as added or modified since REF, or staged",
+        )
+    parser.add_argument(
+        '--exclude', action='append', default=[], metavar='GLOB',
+        help="skip files and directories whose name or path matches GLOB (repeatable)",
+    )
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add --cache and --cache-size, the arguments of memo.configure."""
+    parser.add_argument(
+        '--cache', type=Path, nargs='?', const=memo.DEFAULT_CACHE, default=None, metavar='PATH',
+        help=f"reuse paragraph and bullet splits across files and runs via an on-disk cache "
+             f"(default path: {memo.DEFAULT_CACHE})",
+    )
+    parser.add_argument(
+        '--cache-size', type=int, default=memo.DEFAULT_CACHE_SIZE, metavar='N',
+        help=f"keep at most N cache entries, evicting the least recently used (default: {memo.DEFAULT_CACHE_SIZE})",
+    )
+
+
+def add_runner_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options shared by every content script."""
+    parser.add_argument(
+        '-j', '--jobs', type=jobs_count, default=1, metavar='N',
+        help="process files across N worker processes (0 = one per CPU, default: 1)",
+    )
+    parser.add_argument(
+        '--prefetch', type=int, default=0, metavar='N',
+        help="without --jobs, keep up to N files' reads and writes in flight on I/O threads "
+             "while lessons are transformed (default: 0, off)",
+    )
+    parser.add_argument(
+        '--manifest', type=Path, nargs='?', const=DEFAULT_MANIFEST, default=None, metavar='PATH',
+        help=f"skip files unchanged since these stages last processed them (default path: {DEFAULT_MANIFEST})",
+    )
+    add_cache_arguments(parser)
+    add_selection_arguments(parser)
+    parser.add_argument(
+        '--shard', type=shard_spec, metavar='I/N',
+        help="only process the I-th of N shards of the lessons, split by a stable hash of their paths",
+    )
+    parser.add_argument(
+        '--results', type=Path, metavar='PATH',
+        help="write every file's result to PATH as JSON once the run is done, for --merge",
+    )
+    parser.add_argument(
+        '--merge', type=Path, nargs='+', metavar='RESULTS',
+        help="process nothing; print the summary of the --results files of every shard of a run",
+    )
+    parser.add_argument(
+        '-n', '--dry-run', action='store_true',
+        help="report what would change without writing any file or the manifest",
+    )
+    parser.add_argument(
+        '--diff', action='store_true',
+        help="like --dry-run, and stream a unified diff of each change to stdout (the report goes to stderr)",
+    )
+    parser.add_argument(
+        '--transaction', action='store_true',
+        help="stage every rewrite and commit them together once all files are done, "
+             "or write nothing if any file fails",
+    )
+    parser.add_argument(
+        '--stream-over', type=megabytes, default=DEFAULT_STREAM_OVER, metavar='MB',
+        help=f"stream files of at least MB megabytes line by line instead of loading them "
+             f"(default: {DEFAULT_STREAM_OVER // (1024 * 1024)}; ignored with --diff)",
+    )
+    parser.add_argument(
+        '--report', type=Path, metavar='PATH',
+        help="record per-file and per-stage timings, bytes and rule hits into PATH (.json, or .csv)",
+    )
+    parser.add_argument(
+        '--top', type=int, default=10, metavar='N',
+        help="how many of the slowest files --report lists (default: 10)",
+    )
+    parser.add_argument(
+        '--watch', action='store_true',
+        help="after the run, keep polling the tree and process lessons as they are saved (Ctrl-C to stop)",
+    )
+    parser.add_argument(
+        '--interval', type=float, default=DEFAULT_INTERVAL, metavar='SECONDS',
+        help=f"how often --watch polls the tree (default: {DEFAULT_INTERVAL})",
+    )
+
+
+def run_options(args: argparse.Namespace, version: Optional[str] = None) -> RunOptions:
+    """The RunOptions selected by the parsed runner arguments."""
+    return RunOptions(version, not (args.dry_run or args.diff), args.diff, args.stream_over,
+                      args.report is not None, args.cache, args.cache_size, args.transaction)
+
+
+def file_filter(include: Include, args: argparse.Namespace) -> Include:
+    """`include` (a PathFilter, another callable or None) with the --exclude globs added."""
+    globs = getattr(args, 'exclude', None)
+    if not globs:
+        return include
+    if include is None:
+        return ALL.excluding(globs)
+    if isinstance(include, PathFilter):
+        return include.excluding(globs)
+    excluded = ALL.excluding(globs)
+    return lambda path: excluded(path) and include(path)
+
+
+def select_files(content_dir: Path, include: Include, args: argparse.Namespace) -> List[Path]:
+    """The '*.md' files under content_dir that `include` accepts (default: all).
+
+    The tree is walked by walk_markdown, so a PathFilter prunes directories
+    before they are listed. With --since only the files git reports as
+    changed are considered, and the tree is not walked at all. With --shard
+    only this shard's files are returned, and with --merge the files recorded
+    in the results being merged.
+    """
+    merge = getattr(args, 'merge', None)
+    if merge:
+        from .shards import load_results
+        return [Path(record['path']) for record in load_results(merge).files]
+
+    include = file_filter(include, args)
+    if args.since is None:
+        files = list(walk_markdown(content_dir, include))
+    else:
+        from .changed import GitError, changed_files
+        try:
+            candidates = changed_files(args.since, content_dir)
+        except GitError as e:
+            raise SystemExit(f"--since {args.since}: {e}")
+        files = [path for path in candidates if include is None or include(path)]
+
+    shard = getattr(args, 'shard', None)
+    if shard is not None:
+        from .shards import in_shard
+        files = [path for path in files if in_shard(path, content_dir, shard)]
+    return files
+
+
+def report_stream(args: argparse.Namespace) -> TextIO:
+    """Where a script prints its report: stderr with --diff, so stdout is a clean patch."""
+    return sys.stderr if args.diff else sys.stdout
+
+
+def report_result(result: FileResult, verb: str, out: TextIO, errors: Optional[TextIO] = None,
+                  show_stages: bool = False, flush: bool = False) -> None:
+    """Print a file's line of a script's report: its error, or '<verb>: <path>' if it was modified.
+
+    Errors go to `errors` (default stderr); with `show_stages` the stages that
+    changed the file follow its path.
+    """
+    if result.error:
+        print(f"Error processing {result.path}: {result.error}", file=errors or sys.stderr, flush=flush)
+    elif result.modified:
+        stages = f" ({', '.join(result.stages)})" if show_stages else ''
+        print(f"{verb}: {result.path}{stages}", file=out, flush=flush)
+
+
+def report_summary(args: argparse.Namespace, skipped: int, out: TextIO) -> None:
+    """Print the lines that close a script's report, after its own count of the files changed."""
+    if skipped:
+        print(f"Skipped {skipped} files unchanged since the last run", file=out)
+    if args.dry_run or args.diff:
+        print("Dry run: no files were written", file=out)
+
+
+def watch_and_report(content_dir: Path, include: Include, stages: Sequence[Stage], args: argparse.Namespace,
+                     verb: str, out: TextIO, errors: Optional[TextIO] = None, show_stages: bool = False) -> None:
+    """With --watch, process lessons under content_dir as they are saved, reported like the run before."""
+    if not args.watch:
+        return
+    from .watch import watch_files
+    print(f"\nWatching {content_dir} for changes (Ctrl-C to stop)", file=out, flush=True)
+    for result in watch_files(content_dir, include, stages, args):
+        report_result(result, verb, out, errors, show_stages, flush=True)
+
+
+def decode_lesson(data: bytes) -> str:
+    """Decode a lesson the way Path.read_text does, including newline translation."""
+    text = data.decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def encode_lesson(text: str) -> bytes:
+    """Encode a lesson the way Path.write_text does."""
+    if os.linesep != '\n':
+        text = text.replace('\n', os.linesep)
+    return text.encode('utf-8')
+
+
+def _file_state(stat: os.stat_result, data: bytes, version: str) -> FileState:
+    import hashlib
+    return FileState(stat.st_size, stat.st_mtime_ns, hashlib.sha256(data).hexdigest(), version)
+
+
+def _diff_lines(data: bytes) -> List[str]:
+    """Lines split on '\\n' only, keeping it, so a '\\r' stays part of its line as git sees it."""
+    lines = data.decode('utf-8').split('\n')
+    last = lines.pop()
+    lines = [line + '\n' for line in lines]
+    if last:
+        lines.append(last + '\n\\ No newline at end of file\n')
+    return lines
+
+
+def unified_diff(path: Path, old: bytes, new: bytes) -> str:
+    """A git-style unified diff of one lesson, applicable with `git apply` or `patch -p1`.
+
+    It is taken between the bytes on disk and the bytes written back, so a
+    line-ending rewrite (CRLF or CR to LF) shows up in it too.
+    """
+    import difflib
+    name = path.as_posix()
+    return ''.join(difflib.unified_diff(_diff_lines(old), _diff_lines(new), f"a/{name}", f"b/{name}"))
+
+
+def run_stages(doc: LessonDocument, stages: Sequence[Stage]) -> List[str]:
+    """Run stages over a parsed lesson and return the names of those that changed it."""
+    changed = []
+    for stage in stages:
+        with instrument.timer(f"stage:{stage.name}"):
+            if stage.apply(doc):
+                changed.append(stage.name)
+    return changed
+
+
+def apply_stages(content: str, stages: Sequence[Stage]) -> Tuple[str, List[str]]:
+    """Run stages over one lesson's text and return (new_text, changed_stage_names)."""
+    doc = LessonDocument(content)
+    changed = run_stages(doc, stages)
+    if not changed:
+        return content, changed
+    return doc.text(), changed
+
+
+def render_lesson(data: bytes, content: str, doc: LessonDocument) -> Optional[bytes]:
+    """The bytes of an edited lesson, or None if its text is unchanged.
+
+    `content` is `data` decoded. When decoding changed nothing but the type,
+    the edits are spliced into `data` (see lesson_tools.splice); otherwise the
+    text is encoded afresh.
+    """
+    if b'\r' in data or os.linesep != '\n':
+        text = doc.text()
+        return encode_lesson(text) if text != content else None
+    script = byte_edits(data, doc.edits(), doc.original_length)
+    if not script:
+        return None
+    new_data = apply_edits(data, script)
+    return new_data if new_data != data else None
+
+
+def stream_lesson(file_path: Path, stat: os.stat_result, stages: Sequence[Stage],
+                  known: Optional[FileState], options: RunOptions,
+                  metrics: Optional[FileMetrics] = None) -> FileResult:
+    """process_lesson for large files: stream the stages through a temp file.
+
+    Only the current line of each stage (and the bullets of the current
+    section) is held in memory. The temp file sits next to the lesson and
+    replaces it atomically if anything changed.
+    """
+    import shutil
+
+    version = options.version
+    state = None
+    if version is not None:
+        state = FileState(stat.st_size, stat.st_mtime_ns, file_sha256(file_path), version)
+        if known is not None and known.sha256 == state.sha256 and known.version == version:
+            return FileResult(file_path, skipped=True, state=state)
+    with mapped(file_path) as data:
+        if not needs_work(data, stages):
+            instrument.hit('prefilter.skip')
+            if metrics is not None:
+                metrics.bytes_in = metrics.bytes_out = stat.st_size
+            return FileResult(file_path, state=state)
+
+    active = list(stages)
+    temp_path = new_temp_path(file_path)
+    try:
+        while True:
+            statuses = [StreamStatus() for _ in active]
+            # Same newline handling as read_text/write_text
+            with open(file_path, encoding='utf-8') as source, open(temp_path, 'w', encoding='utf-8') as target:
+                lines = read_lines(source)
+                for stage, status in zip(active, statuses):
+                    lines = stage.stream(lines, status)
+                write_lines(target, lines)
+            if metrics is not None:
+                metrics.bytes_in, metrics.bytes_out = stat.st_size, temp_path.stat().st_size
+            stale = {stage.name for stage, status in zip(active, statuses) if status.stale}
+            if not stale:
+                break
+            # Those stages leave the lesson untouched; run the rest without them
+            active = [stage for stage in active if stage.name not in stale]
+
+        changed = [stage.name for stage, status in zip(active, statuses) if status.changed]
+        if not changed:
+            return FileResult(file_path, state=state)
+        if not options.write:
+            return FileResult(file_path, modified=True, stages=changed)
+
+        if file_path.stat().st_mtime_ns != stat.st_mtime_ns:
+            return FileResult(file_path, error="changed while being processed, left as is")
+        shutil.copymode(file_path, temp_path)
+        if options.stage:
+            staged = StagedWrite(file_path, temp_path, stat.st_mtime_ns)
+            if version is not None:
+                new_stat = temp_path.stat()
+                state = FileState(new_stat.st_size, new_stat.st_mtime_ns, file_sha256(temp_path), version)
+            temp_path = None  # the transaction owns it now
+            return FileResult(file_path, modified=True, state=state, stages=changed, staged=staged)
+        os.replace(temp_path, file_path)
+        if version is not None:
+            stat = file_path.stat()
+            state = FileState(stat.st_size, stat.st_mtime_ns, file_sha256(file_path), version)
+        return FileResult(file_path, modified=True, state=state, stages=changed)
+    finally:
+        if temp_path is not None:
+            temp_path.unlink(missing_ok=True)
+
+
+def process_lesson(file_path: Path, stages: Sequence[Stage],
+                   known: Optional[FileState] = None, options: RunOptions = RunOptions()) -> FileResult:
+    """Read, transform and (if changed) rewrite one lesson.
+
+    When `options.version` is given the result carries the file's new manifest
+    state, and a file whose bytes still hash to `known` is skipped before
+    decoding. Without `options.write` the file is left as it is and the result
+    only reports (and, with `options.diff`, shows) the change. Large files are
+    handed to stream_lesson. With `options.instrument` the result carries
+    the file's FileMetrics. With `options.cache` the transform caches are
+    backed by that file; call memo.flush() once done.
+    """
+    if options.cache is not None:
+        memo.configure(options.cache, options.cache_size)
+    if not options.instrument:
+        result = _process_lesson(file_path, stages, known, options)
+    else:
+        for stage in stages:
+            stage.module  # load the scripts first, so the import is not charged to this file
+        with instrument.recording() as metrics:
+            result = _process_lesson(file_path, stages, known, options, metrics)
+        result.metrics = metrics
+    memo.flush(force=False)
+    return result
+
+
+def _process_lesson(file_path: Path, stages: Sequence[Stage], known: Optional[FileState],
+                    options: RunOptions, metrics: Optional[FileMetrics] = None) -> FileResult:
+    try:
+        stat = file_path.stat()
+        if should_stream(stat, stages, options):
+            return stream_lesson(file_path, stat, stages, known, options, metrics)
+        with mapped(file_path) as data:
+            result, data = transform_lesson(file_path, stat, data, stages, known, options, metrics)
+        return store_lesson(result, stat, data, options) if data is not None else result
+    except Exception as e:
+        return failed_lesson(file_path, e, metrics)
+
+
+def should_stream(stat: os.stat_result, stages: Sequence[Stage], options: RunOptions) -> bool:
+    return stat.st_size >= options.stream_over and not options.diff and all(stage.streams for stage in stages)
+
+
+def transform_lesson(file_path: Path, stat: os.stat_result, data: bytes, stages: Sequence[Stage],
+                     known: Optional[FileState], options: RunOptions,
+                     metrics: Optional[FileMetrics] = None) -> Tuple[FileResult, Optional[bytes]]:
+    """The CPU half of process_lesson: return the result and the bytes to write, if any.
+
+    `data` may be an mmap of the file (see lesson_tools.prefilter); a lesson
+    no stage would change is answered from it without being decoded.
+    """
+    version = options.version
+    if metrics is not None:
+        metrics.bytes_in = metrics.bytes_out = len(data)
+    state = _file_state(stat, data, version) if version is not None else None
+    if known is not None and state is not None and known.sha256 == state.sha256 and known.version == version:
+        return FileResult(file_path, skipped=True, state=state), None
+    if not needs_work(data, stages):
+        instrument.hit('prefilter.skip')
+        return FileResult(file_path, state=state), None
+
+    data = bytes(data)
+    content = decode_lesson(data)
+    doc = LessonDocument(content)
+    changed = run_stages(doc, stages)
+    new_data = render_lesson(data, content, doc) if changed else None
+    if new_data is None:
+        return FileResult(file_path, state=state), None
+
+    diff = unified_diff(file_path, data, new_data) if options.diff else None
+    data = new_data
+    if metrics is not None:
+        metrics.bytes_out = len(data)
+    result = FileResult(file_path, modified=True, stages=changed, diff=diff)
+    return result, data if options.write else None
+
+
+def store_lesson(result: FileResult, stat: os.stat_result, data: bytes, options: RunOptions) -> FileResult:
+    """Write a transformed lesson, unless it was saved again since `stat` was taken.
+
+    With `options.stage` the bytes go to a temp file instead, for the run's Transaction.
+    """
+    file_path = result.path
+    if file_path.stat().st_mtime_ns != stat.st_mtime_ns:
+        # Saved again while we worked; don't clobber the newer edit
+        return FileResult(file_path, error="changed while being processed, left as is")
+    if options.stage:
+        # The rename at commit keeps the temp file's mtime, so its state is the lesson's
+        result.staged = stage_write(file_path, data, stat)
+        if options.version is not None:
+            result.state = _file_state(result.staged.temp.stat(), data, options.version)
+        return result
+    file_path.write_bytes(data)
+    if options.version is not None:
+        result.state = _file_state(file_path.stat(), data, options.version)
+    return result
+
+
+def failed_lesson(file_path: Path, error: Exception, metrics: Optional[FileMetrics] = None) -> FileResult:
+    if metrics is not None:
+        metrics.error = f"{type(error).__name__}: {error}"
+    return FileResult(file_path, error=str(error))
+
+
+def _process_chunk(stages: Sequence[Stage], options: RunOptions,
+                   chunk: List[Tuple[Path, Optional[FileState]]]) -> List[FileResult]:
+    results = [process_lesson(file_path, stages, state, options) for file_path, state in chunk]
+    memo.flush()
+    return results
+
+
+def _map(files: List[Path], known: List[Optional[FileState]], stages: Sequence[Stage],
+         options: RunOptions, jobs: int, prefetch: int) -> Iterator[FileResult]:
+    if jobs <= 1 and prefetch > 0 and len(files) > 1:
+        from .prefetch import prefetch_map  # imports this module
+        yield from prefetch_map(files, known, stages, options, prefetch)
+        return
+    if jobs <= 1 or len(files) <= 1:
+        for file_path, state in zip(files, known):
+            yield process_lesson(file_path, stages, state, options)
+        return
+
+    # Submit chunks through a bounded window rather than all at once, so results
+    # (and diffs) waiting to be consumed in order never pile up in memory
+    chunksize = max(1, min(64, len(files) // (jobs * 4)))
+    tasks = list(zip(files, known))
+    chunks = (tasks[i:i + chunksize] for i in range(0, len(tasks), chunksize))
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_process_chunk, stages, options, chunk))
+            if len(pending) >= jobs * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def process_files(files: List[Path], stages: Sequence[Stage], args: argparse.Namespace) -> Iterator[FileResult]:
+    """Yield a FileResult for every file, in the order given.
+
+    `args` are the parsed runner options. With more than one job the files are
+    spread over a process pool; results still come back in input order, so the
+    report matches a sequential run. With a manifest, files whose stat matches
+    the state recorded for these stages and their versions are skipped up front.
+    With --dry-run or --diff nothing is written, not even the manifest, and with
+    --diff each change is written to stdout as soon as its result arrives. With
+    --report the per-file metrics are written out once all files are done.
+    With --transaction the rewrites are committed after the last result, or
+    rolled back (and the run exits with an error) if any file failed or the
+    run was cut short; the results are held back until then, and after a
+    rollback none of them is modified. The manifest is only saved for a
+    committed run.
+    With --results every result is recorded to a file once the run is done,
+    and with --merge the results recorded by the shards of a run are
+    yielded instead of processing anything.
+    """
+    if args.merge:
+        yield from merged_results(files, stages, args)
+        return
+
+    manifest = Manifest.load(args.manifest) if args.manifest else None
+    name = pipeline_name(stages)
+    options = run_options(args, pipeline_version(stages) if manifest else None)
+    write = options.write
+    report = Report() if options.instrument else None
+    transaction = Transaction() if options.stage and write else None
+    failed = 0
+    held: List[FileResult] = []
+    records: Optional[List[dict]] = [] if args.results is not None else None
+    if options.cache is not None:
+        import sqlite3
+        try:
+            memo.configure(options.cache, options.cache_size)
+        except sqlite3.Error as e:
+            raise SystemExit(f"--cache {options.cache}: {e}")
+
+    pending: List[Path] = []
+    known: List[Optional[FileState]] = []
+    current = set()
+    for file_path in files:
+        state = manifest.get(name, file_path) if manifest else None
+        if state is not None:
+            try:
+                if state.matches_stat(file_path.stat(), options.version):
+                    current.add(file_path)
+                    continue
+            except OSError:
+                pass
+        pending.append(file_path)
+        known.append(state)
+
+    results = _map(pending, known, stages, options, args.jobs, args.prefetch)
+    try:
+        for file_path in files:
+            if file_path in current:
+                if records is not None:
+                    records.append(result_record(FileResult(file_path, skipped=True)))
+                if transaction is not None:
+                    held.append(FileResult(file_path, skipped=True))
+                else:
+                    yield FileResult(file_path, skipped=True)
+                continue
+            result = next(results)
+            if records is not None:
+                records.append(result_record(result))
+            if transaction is not None:
+                if result.staged is not None:
+                    transaction.add(result.staged)
+                failed += result.error is not None
+            if result.diff:
+                sys.stdout.write(result.diff)
+                sys.stdout.flush()
+            if report is not None and result.metrics is not None:
+                report.add(file_path, result.metrics, result.modified, result.stages)
+            if manifest is not None and write:
+                if result.state is not None:
+                    manifest.set(name, file_path, result.state)
+                else:
+                    manifest.discard(name, file_path)
+            if transaction is not None:
+                held.append(result)
+            else:
+                yield result
+        if transaction is not None:
+            count = len(transaction)
+            error = f"{failed} file(s) failed" if failed else None
+            if failed:
+                transaction.rollback()
+            else:
+                try:
+                    transaction.commit()
+                except TransactionError as e:
+                    error = str(e)
+            if error is not None:
+                for result in held:
+                    yield replace(result, modified=False, stages=[], staged=None)
+                raise SystemExit(f"Rolled back: {error}; none of the {count} rewrite(s) were written")
+            yield from held
+            print(f"Committed {count} rewrite(s)", file=report_stream(args))
+        if records is not None:
+            from .shards import write_results
+            write_results(args.results, name, args.shard, records)
+    finally:
+        results.close()
+        if transaction is not None:
+            transaction.rollback()  # interrupted, or a file failed; a no-op once committed
+        memo.flush()
+        if manifest is not None and write and (transaction is None or transaction.committed):
+            manifest.save()
+        if report is not None:
+            report.write(args.report, args.top)
+            report.print_summary(report_stream(args), args.top)
+            print(f"Wrote report to {args.report}", file=report_stream(args))
+
+
+def result_record(result: FileResult) -> dict:
+    """The part of a FileResult a script's summary uses, for --results."""
+    return {'path': result.path.as_posix(), 'modified': result.modified, 'skipped': result.skipped,
+            'error': result.error, 'stages': result.stages}
+
+
+def merged_results(files: List[Path], stages: Sequence[Stage], args: argparse.Namespace) -> Iterator[FileResult]:
+    """process_files for --merge: the recorded result of every file, in the order given."""
+    from .shards import load_results
+    if args.watch:
+        raise SystemExit("--merge cannot be combined with --watch")
+    run = load_results(args.merge)
+    name = pipeline_name(stages)
+    if run.pipeline != name:
+        raise SystemExit(f"--merge: the results are of {run.pipeline}, not {name}")
+    results = {
+        Path(record['path']): FileResult(Path(record['path']), record['modified'], record['skipped'],
+                                         record['error'], stages=record['stages'])
+        for record in run.files
+    }
+    for file_path in files:
+        yield results[file_path]
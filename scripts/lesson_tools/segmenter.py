@@ -0,0 +1,258 @@
+"""
+Single-pass paragraph segmenter behind `paragraph_to_bullets`.
+
+The paragraph is whitespace-normalized once. Sentence boundaries are then found
+lazily in one left-to-right scan, and every later rule (leading-conjunction
+stripping, comma + capital clause splits, conjunction splits, truncation) works
+on offsets into that one string, so lengths are plain arithmetic and text is
+only copied for bullets that are actually returned. Segmentation stops as soon
+as MAX_BULLETS bullets have been produced.
+
+The output is exactly what the original chain of `re.split` passes produced,
+including its quirks (e.g. the double space after a conjunction inside a
+regrouped bullet).
+"""
+
+import re
+from typing import Iterator, List, Optional, Tuple, Union
+
+from .instrument import hit
+
+Span = Tuple[int, int]
+
+MIN_SENTENCE_LENGTH = 15      # shorter sentences are dropped outright
+MIN_BULLET_LENGTH = 20        # a sentence kept as-is must be at least this long
+MAX_BULLET_LENGTH = 120       # ... and at most this long; longer ones are split or truncated
+MAX_CLAUSE_LENGTH = 100       # comma-split clauses must be strictly between MIN_BULLET and this
+SPLIT_CONJUNCTIONS_OVER = 80  # sentences longer than this are split on conjunctions
+TRUNCATE_AT = 117             # truncated sentences keep this many characters plus '...'
+MIN_CLEAN_LENGTH = 15         # cleaned bullets outside MIN_CLEAN..MAX_BULLET are dropped
+RESPLIT_OVER = 100            # cleaned bullets longer than this are re-split on commas
+RESPLIT_TARGET = 90           # ... into pieces shorter than this
+MAX_BULLETS = 7
+FALLBACK_LENGTH = 200
+
+SENTENCE_BOUNDARY = re.compile(r'[.!?]\s+(?=[A-Z])')
+LEADING_CONJUNCTION = re.compile(
+    r'(and|but|or|whilst|while|also|additionally|furthermore|moreover|however|therefore|thus|hence),?\s+',
+    re.IGNORECASE,
+)
+CLAUSE_BOUNDARY = re.compile(r',\s+(?=[A-Z][a-z]{3,})')
+HAS_CONJUNCTION = re.compile(r'\b(and|whilst|while|also)\b', re.IGNORECASE)
+CONJUNCTION = re.compile(r'\s+(and|whilst|while|also)\s+', re.IGNORECASE)
+
+
+class Segmenter:
+    """Turns one paragraph into bullets; see the module docstring."""
+
+    __slots__ = ('text',)
+
+    def __init__(self, paragraph: str):
+        self.text = ' '.join(paragraph.split())
+
+    def _strip(self, start: int, end: int) -> Span:
+        text = self.text
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return start, end
+
+    def sentences(self) -> Iterator[Span]:
+        """Yield stripped sentence spans, splitting on '.', '!' or '?' before a capital."""
+        start = 0
+        for match in SENTENCE_BOUNDARY.finditer(self.text):
+            yield self._strip(start, match.start())
+            start = match.end()
+        yield self._strip(start, len(self.text))
+
+    def _clause_split(self, start: int, end: int) -> Optional[List[Span]]:
+        """Split a long sentence on ', ' before a capitalized word, keeping mid-length clauses."""
+        parts = []
+        position = start
+        for match in CLAUSE_BOUNDARY.finditer(self.text, start, end):
+            parts.append(self._strip(position, match.start()))
+            position = match.end()
+        if not parts:
+            return None
+        parts.append(self._strip(position, end))
+        return [part for part in parts if MIN_BULLET_LENGTH < part[1] - part[0] < MAX_CLAUSE_LENGTH]
+
+    def _conjunction_split(self, start: int, end: int) -> Optional[Iterator[str]]:
+        """Split a sentence on 'and'/'whilst'/'while'/'also', regrouping short runs.
+
+        A run is tracked as (start, end, insert points, length): its text is the
+        slice start..end with one extra space inserted after each conjunction
+        that is followed by more text in the run, as the original string
+        concatenation produced.
+        """
+        text = self.text
+        matches = list(CONJUNCTION.finditer(text, start, end))
+        if not matches:
+            return None
+
+        runs: List[Tuple[int, int, List[int], int]] = []
+        run_start, inserts, length = start, [], 0
+        position = start
+        conjunction_end = start
+        count = len(matches)
+        for i in range(count + 1):
+            # Text part
+            text_end = matches[i].start() if i < count else end
+            if i == 0:
+                length = text_end - position
+            elif length - 1 > 30:  # the run ends in a conjunction plus a space
+                runs.append((run_start, conjunction_end, inserts, length - 1))
+                run_start, inserts, length = position, [], text_end - position
+            else:
+                inserts.append(conjunction_end)
+                length += 1 + text_end - position
+            if i == count:
+                break
+
+            # Conjunction: finish a substantial run, else carry the conjunction along
+            conjunction_start, conjunction_end = matches[i].span(1)
+            if length > 40:
+                runs.append((run_start, text_end, inserts, length))
+                run_start, inserts, length = conjunction_start, [], conjunction_end - conjunction_start + 1
+            else:
+                length += conjunction_end - conjunction_start + 2
+            position = matches[i].end()
+        runs.append((run_start, end, inserts, length))
+
+        if len(runs) <= 1:
+            return None
+        return (
+            self._join_run(run_start, run_end, inserts)
+            for run_start, run_end, inserts, size in runs
+            if MIN_BULLET_LENGTH < size < MAX_BULLET_LENGTH
+        )
+
+    def _join_run(self, start: int, end: int, inserts: List[int]) -> str:
+        if not inserts:
+            return self.text[start:end]
+        bounds = [start] + inserts + [end]
+        return ' '.join(self.text[bounds[k]:bounds[k + 1]] for k in range(len(bounds) - 1))
+
+    def candidates(self) -> Iterator[Union[Span, str]]:
+        """Yield raw bullet candidates, sentence by sentence.
+
+        A candidate is a span of the text, or a string when it is not a plain
+        slice (conjunction runs and truncated sentences).
+        """
+        text = self.text
+        for start, end in self.sentences():
+            if end - start < MIN_SENTENCE_LENGTH:
+                continue
+
+            # Remove leading conjunctions that don't make sense at start of bullet
+            match = LEADING_CONJUNCTION.match(text, start, end)
+            if match:
+                start = match.end()
+            length = end - start
+
+            if length > MAX_BULLET_LENGTH:
+                clauses = self._clause_split(start, end)
+                if clauses:
+                    hit('paragraph_to_bullets.clause_split')
+                    yield from clauses
+                    continue
+
+            if length > SPLIT_CONJUNCTIONS_OVER and HAS_CONJUNCTION.search(text, start, end):
+                groups = self._conjunction_split(start, end)
+                if groups is not None:
+                    hit('paragraph_to_bullets.conjunction_split')
+                    yield from groups
+                    continue
+
+            if MIN_BULLET_LENGTH <= length <= MAX_BULLET_LENGTH:
+                yield (start, end)
+            elif length > MAX_BULLET_LENGTH:
+                # Too long - truncate at the last word boundary
+                hit('paragraph_to_bullets.truncate')
+                cut = text.rfind(' ', start, start + TRUNCATE_AT)
+                yield text[start:cut if cut >= 0 else start + TRUNCATE_AT] + '...'
+
+    def cleaned(self) -> Iterator[str]:
+        """Yield candidates without a trailing period, capitalized and length-filtered."""
+        text = self.text
+        for candidate in self.candidates():
+            if isinstance(candidate, str):
+                bullet = candidate.strip()
+                if not bullet:
+                    continue
+                # Remove trailing periods (unless abbreviation)
+                if bullet.endswith('.') and len(bullet) > 3:
+                    if not (len(bullet) < 10 and bullet.isupper()):
+                        bullet = bullet[:-1]
+                # Capitalize first letter
+                bullet = bullet[0].upper() + bullet[1:]
+                if MIN_CLEAN_LENGTH <= len(bullet) <= MAX_BULLET_LENGTH:
+                    yield bullet
+                continue
+
+            start, end = candidate
+            if start == end:
+                continue
+            if text[end - 1] == '.' and end - start > 3:
+                if not (end - start < 10 and text[start:end].isupper()):
+                    end -= 1
+            first = text[start].upper()
+            if MIN_CLEAN_LENGTH <= end - start - 1 + len(first) <= MAX_BULLET_LENGTH:
+                yield first + text[start + 1:end]
+
+    def bullets(self, limit: int = MAX_BULLETS) -> List[str]:
+        """Return up to `limit` bullets, re-splitting long ones on commas."""
+        bullets: List[str] = []
+        for bullet in self.cleaned():
+            if len(bullet) > RESPLIT_OVER:
+                hit('paragraph_to_bullets.resplit')
+                bullets.extend(_resplit(bullet))
+            else:
+                bullets.append(bullet)
+            if len(bullets) >= limit:
+                return bullets[:limit]
+
+        # Ensure we have at least something
+        if not bullets:
+            hit('paragraph_to_bullets.fallback')
+            text = self.text
+            if len(text) > FALLBACK_LENGTH:
+                return [text[:FALLBACK_LENGTH - 3] + "..."]
+            return [text]
+        return bullets
+
+
+def _resplit(bullet: str) -> List[str]:
+    """Regroup a long bullet's ', '-separated parts into runs shorter than RESPLIT_TARGET.
+
+    A run is always a contiguous slice of the bullet, so it is tracked as offsets.
+    """
+    if ', ' not in bullet:
+        return [bullet]
+
+    result = []
+    run_start = run_end = 0  # the current run, bullet[run_start:run_end]
+    position = 0
+    while True:
+        separator = bullet.find(', ', position)
+        part_end = len(bullet) if separator < 0 else separator
+        if run_end - run_start + part_end - position < RESPLIT_TARGET:
+            if run_end == run_start:
+                run_start = position
+            run_end = part_end
+        else:
+            if run_end > run_start:
+                result.append(bullet[run_start:run_end].strip())
+            run_start, run_end = position, part_end
+        if separator < 0:
+            break
+        position = separator + 2
+    if run_end > run_start:
+        result.append(bullet[run_start:run_end].strip())
+    return result
+
+
+def paragraph_to_bullets(paragraph: str) -> List[str]:
+    """Convert a paragraph to at most MAX_BULLETS bullet points."""
+    return Segmenter(paragraph).bullets()
@@ -0,0 +1,86 @@
+"""
+Split a run over several machines (--shard, --results, --merge).
+
+`--shard I/N` keeps the lessons whose path under the content directory hashes
+to shard I of N. The hash is CRC-32 of the path, so every machine computes the
+same split from the same tree with no coordination, and a lesson stays in its
+shard as other lessons come and go. Each shard writes its results with
+`--results PATH`; running the same script with `--merge PATH...` reads them
+back and prints the summary an unsharded run would have printed.
+"""
+
+import argparse
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+RESULTS_VERSION = 1
+
+Shard = Tuple[int, int]  # (1-based index, count)
+
+
+def shard_spec(value: str) -> Shard:
+    """argparse type for --shard: 'I/N', the I-th of N shards, counting from 1."""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected I/N, e.g. 1/4, not {value!r}")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard {index} is not between 1 and {count}")
+    return index, count
+
+
+def in_shard(path: Path, root: Path, shard: Shard) -> bool:
+    """True if path falls in shard, by a stable hash of its path under root."""
+    import zlib
+    try:
+        key = path.relative_to(root).as_posix()
+    except ValueError:
+        key = path.as_posix()
+    index, count = shard
+    return zlib.crc32(key.encode('utf-8')) % count == index - 1
+
+
+class ShardRun(NamedTuple):
+    """The --results of one or more shards of a run."""
+    pipeline: str
+    # One dict per file: path, modified, skipped, error, stages
+    files: List[dict]
+
+
+def write_results(path: Path, pipeline: str, shard: Optional[Shard], files: List[dict]) -> None:
+    import json
+    data = {'version': RESULTS_VERSION, 'pipeline': pipeline, 'shard': list(shard) if shard else None,
+            'files': files}
+    path.write_text(json.dumps(data, separators=(',', ':')) + '\n', encoding='utf-8')
+
+
+def load_results(paths: Sequence[Path]) -> ShardRun:
+    """Read and combine --results files, checking they are the complete set of one run's shards."""
+    import json
+    pipelines = set()
+    counts = set()
+    seen = set()
+    files = []
+    for path in paths:
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"--merge {path}: {e}")
+        if data.get('version') != RESULTS_VERSION:
+            raise SystemExit(f"--merge {path}: not a results file of this version")
+        pipelines.add(data['pipeline'])
+        shard = tuple(data['shard']) if data['shard'] else (1, 1)
+        if shard in seen:
+            raise SystemExit(f"--merge {path}: shard {shard[0]}/{shard[1]} given twice")
+        seen.add(shard)
+        counts.add(shard[1])
+        files.extend(data['files'])
+    if len(pipelines) > 1:
+        raise SystemExit(f"--merge: results of different stages ({', '.join(sorted(pipelines))})")
+    if len(counts) > 1:
+        raise SystemExit(f"--merge: results of different shard counts ({', '.join(map(str, sorted(counts)))})")
+    count = counts.pop()
+    missing = [f"{index}/{count}" for index in range(1, count + 1) if (index, count) not in seen]
+    if missing:
+        raise SystemExit(f"--merge: missing shard(s) {', '.join(missing)}")
+    return ShardRun(pipelines.pop(), files)
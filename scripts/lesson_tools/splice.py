@@ -0,0 +1,86 @@
+"""
+Write a lesson by splicing its edits into the original bytes.
+
+A LessonDocument records which of its lines are untouched originals (see
+LessonDocument.edits), so instead of joining and re-encoding every line the
+runner turns the edits into an edit script of (byte offset, length,
+replacement) against the file as read, and copies the unchanged stretches
+between them straight from the original buffer through memoryview slices.
+Re-encoding cost is proportional to the size of the change, and edits made by
+several stages over the same document come out as one script.
+
+Offsets treat the file as if it ended in a newline, so that every line is
+"text plus newline" and inserting or deleting at the end of the file needs no
+special case; the extra newline is dropped again when the pieces are joined.
+"""
+
+from itertools import accumulate, repeat
+from operator import add
+from typing import Iterable, List, Tuple
+
+from .document import LineEdit
+
+# (byte offset, byte length, replacement) against the original file
+ByteEdit = Tuple[int, int, bytes]
+
+
+def line_offsets(data: bytes, first: int, last: int, total: int) -> List[int]:
+    """Byte offsets of lines first..last of `total`; line `total` starts at len(data) + 1.
+
+    Lines are measured from whichever end of the file is nearer, so an edit
+    near the end of a large file doesn't split the whole file.
+    """
+    if first <= total - last:
+        parts = data.split(b'\n', last)[:last]
+        starts = list(accumulate(map(add, map(len, parts), repeat(1)), initial=0))
+        return starts[first:last + 1]
+    # Offsets back from the virtual newline after the last line
+    parts = data.rsplit(b'\n', total - first)[1:] if first < total else []
+    ends = list(accumulate(map(add, map(len, reversed(parts)), repeat(1)), initial=0))
+    return [len(data) + 1 - back for back in reversed(ends)][:last - first + 1]
+
+
+def byte_edits(data: bytes, edits: List[LineEdit], total: int) -> List[ByteEdit]:
+    """Translate line edits of a '\\n'-separated UTF-8 file of `total` lines into an edit script.
+
+    Only the lines from the first edit to the last are measured, and edits
+    that would put back the bytes already there are left out.
+    """
+    if not edits:
+        return []
+    first = edits[0][0]
+    offsets = line_offsets(data, first, edits[-1][1], total)
+    script = []
+    for start, end, lines in edits:
+        offset = offsets[start - first]
+        length = offsets[end - first] - offset
+        replacement = ''.join(line + '\n' for line in lines).encode('utf-8')
+        original = data[offset:offset + length]
+        if offset <= len(data) < offset + length:
+            original += b'\n'
+        if original == replacement:
+            continue
+        script.append((offset, length, replacement))
+    return script
+
+
+def apply_edits(data: bytes, script: Iterable[ByteEdit]) -> bytes:
+    """Apply an edit script, in offset order, copying unchanged bytes through memoryview slices."""
+    view = memoryview(data)
+    pieces = []
+    position = 0
+    for offset, length, replacement in script:
+        pieces.append(view[position:offset])
+        if offset > len(data) >= position:
+            pieces.append(b'\n')  # the virtual final newline, kept before an insertion at the end
+        pieces.append(replacement)
+        position = offset + length
+    if position <= len(data):
+        pieces.append(view[position:])
+    else:
+        # The last edit ran through the virtual final newline; drop it again
+        for k in range(len(pieces) - 1, -1, -1):
+            if len(pieces[k]):
+                pieces[k] = pieces[k][:-1]
+                break
+    return b''.join(pieces)
@@ -0,0 +1,127 @@
+"""
+The content transforms, as named stages that can be chained over one document.
+
+Each stage lives in one of the scripts in this directory, as its
+`transform_document(doc) -> bool`. A stage returns True only if it changed the
+document; a stage that returns False leaves it untouched. A script that also
+defines `transform_lines(lines, status)` can stream very large files (see
+lesson_tools.streaming), and one that defines `might_change(lesson) -> bool`
+lets the runner skip lessons it would not change without decoding them (see
+lesson_tools.prefilter). A script offering a variant of its transform names
+the variant's functions with a suffix, e.g. `transform_document_optimal`. Scripts are loaded by
+path when a stage first runs, so a `Stage` itself is just names and pickles
+cheaply into worker processes.
+"""
+
+import importlib.util
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List
+
+from .document import LessonDocument
+from .streaming import StreamStatus
+
+if TYPE_CHECKING:
+    from .prefilter import LessonBytes
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+
+
+# name -> module, so the per-lesson stage lookups skip resolving paths
+_LOADED: Dict[str, ModuleType] = {}
+
+
+def load_script(name: str) -> ModuleType:
+    """Import scripts/<name>.py, reusing __main__ when that is the same script."""
+    module = _LOADED.get(name)
+    if module is None:
+        module = _LOADED[name] = _load_script(name)
+    return module
+
+
+def _load_script(name: str) -> ModuleType:
+    path = SCRIPTS_DIR / f"{name}.py"
+    main = sys.modules.get('__main__')
+    main_file = getattr(main, '__file__', None)
+    if main_file and Path(main_file).resolve() == path:
+        return main
+
+    module_name = name.replace('-', '_')
+    module = sys.modules.get(module_name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A named transform: `script`'s transform_document, or its variant named by `suffix`."""
+    name: str
+    script: str
+    description: str
+    suffix: str = ''
+
+    @property
+    def module(self) -> ModuleType:
+        return load_script(self.script)
+
+    @property
+    def version(self) -> int:
+        return self.module.TRANSFORM_VERSION
+
+    @property
+    def streams(self) -> bool:
+        return hasattr(self.module, 'transform_lines' + self.suffix)
+
+    def might_change(self, lesson: 'LessonBytes') -> bool:
+        """False only if the stage would certainly leave the lesson as it is."""
+        check = getattr(self.module, 'might_change' + self.suffix, None)
+        return True if check is None else check(lesson)
+
+    def apply(self, doc: LessonDocument) -> bool:
+        return getattr(self.module, 'transform_document' + self.suffix)(doc)
+
+    def stream(self, lines: Iterable[str], status: StreamStatus) -> Iterator[str]:
+        return getattr(self.module, 'transform_lines' + self.suffix)(lines, status)
+
+
+STAGES: Dict[str, Stage] = {
+    stage.name: stage for stage in [
+        Stage('convert', 'convert-bullet-lists', "convert paragraph sections to bullets"),
+        Stage('refine', 'refine-long-bullets', "split bullets over the length limit"),
+        Stage('refine-optimal', 'refine-long-bullets', "split bullets over the length limit at the best breaks",
+              '_optimal'),
+        Stage('case', 'fix-bullet-case-proper', "sentence-case and dedupe bullets"),
+        Stage('lowercase', 'fix-bullet-case', "lowercase the first letter of bullets"),
+    ]
+}
+
+# Stages that undo each other and so cannot run in the same pipeline
+CONFLICTING_STAGES = [{'case', 'lowercase'}]
+
+
+def pipeline_name(stages: Iterable[Stage]) -> str:
+    return '+'.join(stage.name for stage in stages)
+
+
+def pipeline_version(stages: Iterable[Stage]) -> str:
+    return '+'.join(f"{stage.name}@{stage.version}" for stage in stages)
+
+
+def resolve_stages(names: Iterable[str]) -> List[Stage]:
+    """Look stages up by name, rejecting unknown, repeated or conflicting ones."""
+    names = list(names)
+    unknown = [name for name in names if name not in STAGES]
+    if unknown:
+        raise ValueError(f"unknown stage(s): {', '.join(unknown)} (choose from {', '.join(STAGES)})")
+    if len(set(names)) != len(names):
+        raise ValueError("each stage can only run once per pipeline")
+    for conflict in CONFLICTING_STAGES:
+        if conflict <= set(names):
+            raise ValueError(f"stages {' and '.join(sorted(conflict))} undo each other")
+    return [STAGES[name] for name in names]
@@ -0,0 +1,94 @@
+"""
+Line-stream form of the content stages, for lessons too large to hold in memory.
+
+A streaming stage is a generator `transform_lines(lines, status)` that takes an
+iterator of lines (without their '\\n') and yields the transformed lines, so a
+chain of stages reads a file and writes a temp file one line at a time. Lines
+split exactly like `text.split('\\n')`, so the output is byte-for-byte what
+the in-memory `transform_document` path produces.
+
+A stage records in its `StreamStatus` whether it changed the lesson (what
+`transform_document` would have returned) and whether it rewrote any line. A
+stage that rewrote lines without counting as a change (refine only applies
+truncations when it also split a bullet) cannot know that until the end of the
+file, so the runner runs the chain again without it.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Collection, Iterable, Iterator, Optional, TextIO, Tuple
+
+from .document import heading_level
+from .rules import LESSON_RULES
+
+READ_CHUNK = 1 << 20
+
+
+@dataclass
+class StreamStatus:
+    changed: bool = False
+    rewrote: bool = False
+
+    @property
+    def stale(self) -> bool:
+        """True when the output must be discarded because the stage was a no-op."""
+        return self.rewrote and not self.changed
+
+
+def read_lines(stream: TextIO) -> Iterator[str]:
+    """Yield the lines of a text stream the way `text.split('\\n')` would."""
+    last = '\n'
+    for line in stream:
+        if line.endswith('\n'):
+            yield line[:-1]
+        else:
+            yield line
+        last = line
+    if last.endswith('\n'):
+        yield ''
+
+
+def write_lines(stream: TextIO, lines: Iterable[str]) -> None:
+    """Write lines joined by '\\n', the inverse of read_lines."""
+    first = True
+    for line in lines:
+        if not first:
+            stream.write('\n')
+        stream.write(line)
+        first = False
+
+
+def tag_sections(lines: Iterable[str], titles: Collection[str],
+                 subsections: bool = True) -> Iterator[Tuple[str, Optional[str], Optional[int]]]:
+    """Yield (line, rule, n): the line's LESSON_RULES rule and the target section it is in.
+
+    Each line is classified once, here, and the stages route it on the rule
+    name. n numbers the target sections and is None outside the body of a
+    '## <title>' section; `titles` are some of those the 'target_heading' rule
+    matches. With `subsections` a body runs to the next level-2 heading
+    (Section.outer_end), otherwise to the next line starting with '##'
+    (Section.end).
+    """
+    wanted = {'## ' + title for title in titles}
+    current = None
+    count = 0
+    for line in lines:
+        rule = LESSON_RULES.classify(line)
+        if rule in ('target_heading', 'heading') and (not subsections or heading_level(line) == 2):
+            if rule == 'target_heading' and line in wanted:
+                count += 1
+                yield line, rule, None
+                current = count
+                continue
+            current = None
+        yield line, rule, current
+
+
+def file_sha256(path: Path) -> str:
+    """Hash a file in fixed-size chunks."""
+    import hashlib
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,132 @@
+"""
+Synthetic lesson corpus shaped like content/course, for benchmarks.
+
+Lessons are laid out as <track>/<platform>/<NN-module>/<NN-lesson>.md with the
+same ingredients the scripts care about: optional `estimatedTime` frontmatter,
+a Quick Summary blockquote, "What You'll Learn" and "Key Takeaways" in either
+bullet or paragraph form, long and lowercase/duplicate bullets, '###'
+subsections and code fences. Each lesson is generated from its own seed, so a
+given lesson is identical at every corpus size.
+"""
+
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+TRACKS = ['design-track', 'engineering-track', 'convergence']
+PLATFORMS = ['web', 'ios', 'android']
+LESSONS_PER_MODULE = 6
+MODULES_PER_PLATFORM = 8
+
+WORDS = (
+    "design engineer component layout token typography spacing colour motion state "
+    "accessibility system grid contrast hierarchy interaction feedback pattern "
+    "responsive semantic prototype handoff variant animation gesture navigation "
+    "performance rendering constraint platform review workflow library"
+).split()
+CONJUNCTIONS = ['and', 'whilst', 'while', 'also', 'additionally', 'moreover']
+OPENERS = ['Building', 'Testing', 'Shipping', 'Reviewing', 'Designing']
+
+
+@dataclass
+class CorpusStats:
+    files: int
+    bytes: int
+
+
+class _LessonWriter:
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+
+    def phrase(self, low: int, high: int) -> str:
+        return ' '.join(self.rng.choice(WORDS) for _ in range(self.rng.randint(low, high)))
+
+    def sentence(self) -> str:
+        rng = self.rng
+        roll = rng.random()
+        if roll < 0.35:
+            text = self.phrase(5, 18)
+        elif roll < 0.55:
+            text = f"{self.phrase(4, 10)}, {rng.choice(CONJUNCTIONS)} {self.phrase(4, 12)}"
+        elif roll < 0.7:
+            text = f"{self.phrase(4, 8)}; {self.phrase(4, 8)}; {self.phrase(3, 8)}"
+        elif roll < 0.85:
+            text = f"{self.phrase(4, 8)}, {rng.choice(OPENERS)} {self.phrase(6, 16)}"
+        else:
+            text = f"{self.phrase(4, 8)} {rng.choice(CONJUNCTIONS)} {self.phrase(4, 10)} {rng.choice(CONJUNCTIONS)} {self.phrase(6, 14)}"
+        return text[0].upper() + text[1:] if rng.random() < 0.8 else text
+
+    def paragraph(self, low: int = 2, high: int = 6) -> str:
+        return ' '.join(self.sentence() + '.' for _ in range(self.rng.randint(low, high)))
+
+    def bullets(self) -> str:
+        bullets = [self.sentence() for _ in range(self.rng.randint(3, 6))]
+        if self.rng.random() < 0.2:
+            bullets.append(bullets[0].lower())  # case-insensitive duplicate
+        return '\n'.join(f"- {bullet}" for bullet in bullets)
+
+    def outcome_section(self, title: str) -> str:
+        if self.rng.random() < 0.2:
+            return f"## {title}\n\n{self.paragraph()}\n"
+        return f"## {title}\n\n{self.bullets()}\n"
+
+    def lesson(self, title: str) -> str:
+        rng = self.rng
+        parts = []
+        if rng.random() < 0.3:
+            parts.append(f"---\nestimatedTime: {rng.randint(5, 45)}\n---\n")
+        parts.append(f"# {title}\n")
+        parts.append(f"> **Quick Summary:** {self.sentence()}.\n")
+        if rng.random() < 0.9:
+            parts.append(self.outcome_section("What You'll Learn"))
+        for _ in range(rng.randint(2, 6)):
+            parts.append(f"## {self.phrase(2, 5).title()}\n\n{self.paragraph(2, 8)}\n")
+            if rng.random() < 0.5:
+                parts.append(f"### {self.phrase(2, 4).title()}\n\n{self.paragraph(1, 4)}\n")
+            if rng.random() < 0.3:
+                parts.append(f"```tsx\nconst {rng.choice(WORDS)} = use{rng.choice(WORDS).title()}();\n```\n")
+        parts.append(self.outcome_section("Key Takeaways"))
+        if rng.random() < 0.5:
+            parts.append(f"## Next Steps\n\n{self.paragraph(1, 2)}\n")
+        return '\n'.join(parts)
+
+
+def lesson_path(index: int) -> Path:
+    """Relative path of the index-th synthetic lesson."""
+    lesson = index % LESSONS_PER_MODULE
+    module = (index // LESSONS_PER_MODULE) % MODULES_PER_PLATFORM
+    group = index // (LESSONS_PER_MODULE * MODULES_PER_PLATFORM)
+    track = TRACKS[group % len(TRACKS)]
+    platform = PLATFORMS[(group // len(TRACKS)) % len(PLATFORMS)]
+    # Corpora larger than one track/platform grid get numbered copies, like localized forks
+    copy = group // (len(TRACKS) * len(PLATFORMS))
+    root = Path(track) / platform if copy == 0 else Path(f"{track}-{copy:03d}") / platform
+    return root / f"{module:02d}-module" / f"{lesson + 1:02d}-lesson-{index}.md"
+
+
+def generate_corpus(content_dir: Path, files: int, seed: int = 0) -> CorpusStats:
+    """Write `files` synthetic lessons (plus index and _meta files) under content_dir."""
+    total_bytes = 0
+    for index in range(files):
+        path = content_dir / lesson_path(index)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        text = _LessonWriter(seed * 1_000_003 + index).lesson(f"Lesson {index}")
+        path.write_text(text, encoding='utf-8')
+        total_bytes += len(text.encode('utf-8'))
+
+    # Files every script must skip or tolerate
+    for track in TRACKS:
+        (content_dir / track).mkdir(parents=True, exist_ok=True)
+        (content_dir / track / 'index.md').write_text(f"# {track}\n", encoding='utf-8')
+    (content_dir / '_meta').mkdir(parents=True, exist_ok=True)
+    (content_dir / '_meta' / 'COURSE-PLAN.md').write_text("## Key Takeaways\n\n- plan\n- plan\n", encoding='utf-8')
+    return CorpusStats(files, total_bytes)
+
+
+def lesson_files(content_dir: Path) -> List[Path]:
+    """The generated lessons, excluding index and _meta files."""
+    return sorted(
+        path for path in content_dir.rglob('*.md')
+        if '_meta' not in path.parts and path.name != 'index.md'
+    )
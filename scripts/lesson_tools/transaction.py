@@ -0,0 +1,142 @@
+"""
+All-or-nothing rewrites of a set of lessons (--transaction).
+
+Without it each lesson is rewritten in place as soon as it is transformed, so
+a run that fails or is interrupted halfway leaves the tree half normalized.
+With it every rewrite is first staged in a temp file next to its lesson (the
+same filesystem, so the rename below is atomic) and nothing is visible until
+the run is over. `Transaction.commit` then flushes all staged files in one
+batch, checks that no lesson was saved again meanwhile, and renames each temp
+file over its lesson, keeping a hard link to every original until the last
+rename has landed so a failure part way through can put them all back. Each
+directory is fsynced once at the end instead of once per file. If any lesson
+failed, `rollback` just deletes the temp files and the tree is as it was.
+"""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Tuple
+
+
+class TransactionError(Exception):
+    """The staged rewrites could not all be committed; none of them were."""
+
+
+@dataclass(frozen=True)
+class StagedWrite:
+    """A lesson's new bytes, waiting in `temp` to replace `path`."""
+    path: Path
+    temp: Path
+    # mtime of the lesson as it was read; a different one at commit means it was saved again
+    mtime_ns: int
+
+
+def new_temp_path(file_path: Path) -> Path:
+    """Create an empty temp file next to file_path and return its path."""
+    import tempfile
+    fd, name = tempfile.mkstemp(prefix=f".{file_path.name}.", suffix='.tmp', dir=file_path.parent)
+    os.close(fd)
+    return Path(name)
+
+
+def stage_write(file_path: Path, data: bytes, stat: os.stat_result) -> StagedWrite:
+    """Write data to a temp file next to file_path, with its permissions, and return it staged."""
+    import shutil
+    temp = new_temp_path(file_path)
+    try:
+        temp.write_bytes(data)
+        shutil.copymode(file_path, temp)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+    return StagedWrite(file_path, temp, stat.st_mtime_ns)
+
+
+def _fsync(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _backup(file_path: Path) -> Path:
+    """Keep the current file_path under a new name, by hard link where the filesystem allows."""
+    backup = new_temp_path(file_path)
+    backup.unlink()
+    try:
+        os.link(file_path, backup)
+    except OSError:
+        import shutil
+        shutil.copy2(file_path, backup)
+    return backup
+
+
+class Transaction:
+    """The rewrites of one run, committed together or not at all."""
+
+    def __init__(self):
+        self.staged: List[StagedWrite] = []
+        self.committed = False
+
+    def __len__(self) -> int:
+        return len(self.staged)
+
+    def add(self, staged: StagedWrite) -> None:
+        self.staged.append(staged)
+
+    def commit(self) -> None:
+        """Replace every lesson with its staged file, or raise TransactionError having replaced none."""
+        staged = self.staged
+        try:
+            for write in staged:
+                _fsync(write.temp)
+            for write in staged:
+                if write.path.stat().st_mtime_ns != write.mtime_ns:
+                    raise TransactionError(f"{write.path} changed while being processed")
+        except OSError as e:
+            self.rollback()
+            raise TransactionError(str(e)) from e
+        except TransactionError:
+            self.rollback()
+            raise
+
+        replaced: List[Tuple[StagedWrite, Path]] = []
+        try:
+            for write in staged:
+                backup = _backup(write.path)
+                try:
+                    os.replace(write.temp, write.path)
+                except BaseException:
+                    backup.unlink(missing_ok=True)
+                    raise
+                replaced.append((write, backup))
+            self._sync_directories()
+        except BaseException as e:
+            # Put back the originals already replaced, newest first
+            for write, backup in reversed(replaced):
+                os.replace(backup, write.path)
+            self._sync_directories()
+            self.rollback()
+            if isinstance(e, OSError):
+                raise TransactionError(str(e)) from e
+            raise
+
+        self.committed = True
+        self.staged = []
+        for _, backup in replaced:
+            backup.unlink(missing_ok=True)
+
+    def rollback(self) -> None:
+        """Delete the staged files that have not been committed."""
+        for write in self.staged:
+            write.temp.unlink(missing_ok=True)
+        self.staged = []
+
+    def _sync_directories(self) -> None:
+        for directory in sorted({write.path.parent for write in self.staged}):
+            try:
+                _fsync(directory)
+            except OSError:
+                pass  # not every platform can open a directory
@@ -0,0 +1,82 @@
+"""
+List the '*.md' files of a content tree with os.scandir, pruning as it goes.
+
+A `PathFilter` says which lessons to take and, because its rules also apply to
+directories, which directories can be skipped without being entered: every
+file under a '_meta' directory is excluded anyway, so the walk never lists it.
+The scripts that walk lessons share the LESSONS filter, and --exclude adds
+globs to whichever filter a script uses.
+"""
+
+import os
+from dataclasses import dataclass, replace
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class PathFilter:
+    """Rules for excluding files, and the directories that can only hold excluded files."""
+    # Exclude any path containing one of these, e.g. "_meta"
+    substrings: Tuple[str, ...] = ()
+    # Exclude files with exactly these names, e.g. "index.md"
+    names: Tuple[str, ...] = ()
+    # Exclude a file or directory whose name or path matches one of these
+    globs: Tuple[str, ...] = ()
+
+    def __call__(self, path: Path) -> bool:
+        """True if the file at path is included."""
+        if path.name in self.names:
+            return False
+        return self.enters(path)
+
+    def enters(self, directory: Path) -> bool:
+        """False if nothing under directory can be included."""
+        text = str(directory)
+        if any(substring in text for substring in self.substrings):
+            return False
+        if self.globs:
+            for ancestor in (directory, *directory.parents):
+                if any(fnmatchcase(ancestor.name, glob) or fnmatchcase(ancestor.as_posix(), glob)
+                       for glob in self.globs):
+                    return False
+        return True
+
+    def excluding(self, globs: Iterable[str]) -> 'PathFilter':
+        """This filter with more globs to exclude."""
+        return replace(self, globs=self.globs + tuple(globs))
+
+
+ALL = PathFilter()
+# Lessons, without meta files and index files
+LESSONS = PathFilter(substrings=('_meta',), names=('index.md',))
+
+Include = Optional[Callable[[Path], bool]]
+
+
+def walk_markdown(root: Path, include: Include = None) -> Iterator[Path]:
+    """Yield the '*.md' files under root that `include` accepts (default: all).
+
+    A PathFilter also prunes the directories it rejects before they are
+    listed; any other callable only filters files. Symlinked directories are
+    not followed.
+    """
+    enters = include.enters if isinstance(include, PathFilter) else None
+    if enters is not None and not enters(root):
+        return
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                entries = list(entries)
+        except OSError:
+            continue  # missing, or removed while we walked
+        for entry in entries:
+            path = directory / entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if enters is None or enters(path):
+                    stack.append(path)
+            elif entry.name.endswith('.md') and (include is None or include(path)):
+                yield path
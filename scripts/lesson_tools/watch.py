@@ -0,0 +1,119 @@
+"""
+Watch a content tree by stat polling and process lessons as they are saved.
+
+`TreeIndex` keeps the (inode, mtime, size) of every lesson and the mtime and
+listing of every directory. A poll re-lists only directories whose mtime moved
+(a file was added, removed or renamed over, as editors do on save) and stats
+the files, so it costs one stat per file and directory and no full-tree glob.
+"""
+
+import argparse
+import os
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from . import memo
+from .runner import FileResult, file_filter, process_lesson, run_options
+from .stages import Stage
+from .walk import Include, PathFilter
+
+FileKey = Tuple[int, int, int]  # (st_ino, st_mtime_ns, st_size)
+
+
+def _key(stat: os.stat_result) -> FileKey:
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class TreeIndex:
+    """A stat snapshot of the '*.md' files under root that `include` accepts (default: all).
+
+    Directories a PathFilter rejects are never listed, as in walk_markdown.
+    """
+
+    def __init__(self, root: Path, include: Include = None):
+        self.root = root
+        self.include = include
+        self.files: Dict[Path, FileKey] = {}
+        # directory -> (mtime_ns, lesson files, subdirectories)
+        self.dirs: Dict[Path, Tuple[int, List[Path], List[Path]]] = {}
+
+    def _list(self, directory: Path, mtime_ns: int) -> Tuple[List[Path], List[Path]]:
+        cached = self.dirs.get(directory)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1], cached[2]
+        files, subdirs = [], []
+        enters = self.include.enters if isinstance(self.include, PathFilter) else None
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                path = Path(entry.path)
+                if entry.is_dir(follow_symlinks=False):
+                    if enters is None or enters(path):
+                        subdirs.append(path)
+                elif entry.name.endswith('.md') and (self.include is None or self.include(path)):
+                    files.append(path)
+        self.dirs[directory] = (mtime_ns, files, subdirs)
+        return files, subdirs
+
+    def poll(self) -> List[Path]:
+        """Rescan and return the new or changed files, in path order."""
+        changed = []
+        files: Dict[Path, FileKey] = {}
+        dirs = {}
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            try:
+                lessons, subdirs = self._list(directory, directory.stat().st_mtime_ns)
+            except OSError:
+                continue  # removed since it was listed
+            dirs[directory] = self.dirs[directory]
+            stack.extend(subdirs)
+            for path in lessons:
+                try:
+                    key = _key(path.stat())
+                except OSError:
+                    continue
+                files[path] = key
+                if self.files.get(path) != key:
+                    changed.append(path)
+        self.files = files
+        self.dirs = dirs
+        return sorted(changed)
+
+    def refresh(self, path: Path) -> None:
+        """Record a file's current stat, e.g. after we rewrote it ourselves."""
+        try:
+            self.files[path] = _key(path.stat())
+        except OSError:
+            self.files.pop(path, None)
+
+
+def watch_files(root: Path, include: Include, stages: Sequence[Stage],
+                args: argparse.Namespace) -> Iterator[FileResult]:
+    """Yield a FileResult each time a lesson under root is saved, until Ctrl-C.
+
+    Files are compared against the tree as it stands when watching starts, so
+    call this after the initial run. Our own writes are recorded in the index
+    and do not trigger another pass. --manifest is not consulted.
+    """
+    # Each save is written as it is processed; --transaction only covers the initial run
+    options = replace(run_options(args), stage=False)
+    index = TreeIndex(root, file_filter(include, args))
+    index.poll()
+    try:
+        while True:
+            time.sleep(args.interval)
+            for path in index.poll():
+                result = process_lesson(path, stages, None, options)
+                if result.diff:
+                    sys.stdout.write(result.diff)
+                if result.modified and options.write:
+                    index.refresh(path)
+                yield result
+            memo.flush()
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        return
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+One entry point for the lesson scripts in this directory.
+
+  python3 scripts/lessons.py <command> [options]
+
+Each command runs the matching script's main() with the remaining arguments,
+so `lessons.py refine --help` shows refine-long-bullets.py's options. A
+script (and what it imports) is only loaded when its command is used, so the
+listing below and every run start without importing the others.
+"""
+
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# command -> (script in this directory, summary)
+COMMANDS: Dict[str, Tuple[str, str]] = {
+    'normalize': ('normalize-lessons', "run convert, refine and case in one pass"),
+    'convert': ('convert-bullet-lists', "convert paragraph sections to bullets"),
+    'refine': ('refine-long-bullets', "split bullets over the length limit"),
+    'case': ('fix-bullet-case-proper', "sentence-case and dedupe bullets"),
+    'lowercase': ('fix-bullet-case', "lowercase the first letter of bullets"),
+    'check': ('check-lessons', "report what normalize would change"),
+    'near-duplicates': ('find-near-duplicates', "find near-duplicate bullets across the corpus"),
+    'index': ('build-lesson-index', "build the prebuilt course search index"),
+    'worker': ('lesson-worker', "serve the text transforms as JSON lines on stdin/stdout"),
+    'benchmark': ('benchmark-lessons', "benchmark the scripts on a synthetic corpus"),
+}
+
+
+def usage() -> str:
+    width = max(map(len, COMMANDS))
+    commands = '\n'.join(f"  {name:<{width}}  {summary}" for name, (_, summary) in COMMANDS.items())
+    return f"usage: lessons.py <command> [options]\n\ncommands:\n{commands}\n"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print(__doc__.strip() + '\n\n' + usage(), end='')
+        return 0 if argv else 2
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(usage() + f"\nlessons.py: error: unknown command {command!r}", file=sys.stderr)
+        return 2
+
+    from lesson_tools.stages import load_script
+
+    script, _ = COMMANDS[command]
+    module = load_script(script)
+    # The script parses sys.argv itself; its usage line reads "lessons.py <command>"
+    sys.argv = [f"lessons.py {command}", *rest]
+    status = module.main()
+    return status if isinstance(status, int) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Normalize lessons in one pass: convert paragraph sections to bullets, split long
+bullets, then sentence-case and dedupe them.
+
+Each file is read and parsed once, the chosen stages run in order over the same
+document in memory, and the file is written at most once. This replaces running
+convert-bullet-lists.py, refine-long-bullets.py and fix-bullet-case-proper.py
+one after another.
+"""
+
+import argparse
+from collections import Counter
+from pathlib import Path
+
+from lesson_tools.runner import (
+    add_runner_arguments, process_files, report_result, report_stream, report_summary, select_files,
+    watch_and_report,
+)
+from lesson_tools.stages import STAGES, resolve_stages
+from lesson_tools.walk import LESSONS
+
+CONTENT_DIR = Path("content/course")
+DEFAULT_STAGES = ['convert', 'refine', 'case']
+
+
+def parse_stages(value: str):
+    """argparse type for --stages: a comma-separated list of stage names."""
+    try:
+        return resolve_stages(name.strip() for name in value.split(',') if name.strip())
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def main():
+    stage_help = ', '.join(f"{name} ({stage.description})" for name, stage in STAGES.items())
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        '--stages', type=parse_stages, default=resolve_stages(DEFAULT_STAGES), metavar='LIST',
+        help=f"comma-separated stages to run, in order (default: {','.join(DEFAULT_STAGES)}). Stages: {stage_help}",
+    )
+    add_runner_arguments(parser)
+    args = parser.parse_args()
+    out = report_stream(args)
+
+    files = select_files(CONTENT_DIR, LESSONS, args)
+
+    print(f"Found {len(files)} lesson files to process", file=out)
+
+    modified_count = 0
+    skipped_count = 0
+    stage_counts = Counter()
+    for result in process_files(sorted(files), args.stages, args):
+        report_result(result, "Modified", out, show_stages=True)
+        if result.modified:
+            modified_count += 1
+            stage_counts.update(result.stages)
+        elif result.skipped:
+            skipped_count += 1
+
+    print(f"\nProcessed {len(files)} files, modified {modified_count} files", file=out)
+    for stage in args.stages:
+        print(f"  {stage.name}: {stage_counts[stage.name]} files", file=out)
+    report_summary(args, skipped_count, out)
+
+    watch_and_report(CONTENT_DIR, LESSONS, args.stages, args, "Modified", out, show_stages=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,39 @@
 #!/usr/bin/env python3
 """
 Refine long bullets (>100 chars) into shorter, more concise bullets.
+
+With --optimal, bullets are split by lesson_tools.linebreak instead: the
+breaks are chosen together so every piece fits, and no text is dropped. A
+bullet the default splitter already splits cleanly keeps its breaks.
 """
 
+import argparse
+import inspect
 import re
+from bisect import bisect
+from itertools import groupby
 from pathlib import Path
-from typing import List, Tuple
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+from lesson_tools import LessonDocument, instrument, memo, prefilter
+from lesson_tools.linebreak import split_at, split_text
+from lesson_tools.rules import ANY_BULLETS, LESSON_RULES
+from lesson_tools.runner import (
+    add_runner_arguments, process_files, process_lesson, report_result, report_stream, report_summary,
+    select_files, watch_and_report,
+)
+from lesson_tools.stages import STAGES
+from lesson_tools.streaming import StreamStatus, tag_sections
+from lesson_tools.walk import LESSONS
 
 CONTENT_DIR = Path("content/course")
 MAX_BULLET_LENGTH = 100
+# Bump whenever the output changes, so --manifest reprocesses every file
+TRANSFORM_VERSION = 2
 
 
+@instrument.timed
+@memo.cached(TRANSFORM_VERSION)
 def split_long_bullet(bullet: str) -> List[str]:
     """Split a long bullet into shorter bullets."""
     bullet = bullet.strip()
@@ -56,6 +79,7 @@ def split_long_bullet(bullet: str) -> List[str]:
             bullets.append(current.strip())
         
         if len(bullets) > 1:
+            instrument.hit('split_long_bullet.pattern1')
             return [f"- {b}" for b in bullets if 15 <= len(b) <= MAX_BULLET_LENGTH]
     
     # Pattern 2: Split on semicolons
@@ -64,6 +88,7 @@ def split_long_bullet(bullet: str) -> List[str]:
         if len(parts) > 1:
             bullets = [f"- {p}" for p in parts if 15 <= len(p) <= MAX_BULLET_LENGTH]
             if len(bullets) > 1:
+                instrument.hit('split_long_bullet.pattern2')
                 return bullets
     
     # Pattern 3: Split on "and" or "whilst" in the middle
@@ -103,6 +128,7 @@ def split_long_bullet(bullet: str) -> List[str]:
                 bullets.append(current.strip())
             
             if len(bullets) > 1:
+                instrument.hit('split_long_bullet.pattern3')
                 return [f"- {b}" for b in bullets if 15 <= len(b) <= MAX_BULLET_LENGTH]
     
     # Pattern 4: If still too long, try to truncate intelligently
@@ -112,96 +138,190 @@ def split_long_bullet(bullet: str) -> List[str]:
         truncate_at = MAX_BULLET_LENGTH - 20
         for i in range(truncate_at, max(0, truncate_at - 50), -1):
             if content[i] in ',.':
+                instrument.hit('split_long_bullet.pattern4')
                 return [f"- {content[:i+1].strip()}"]
         
         # Fallback: just truncate
+        instrument.hit('split_long_bullet.pattern4_ellipsis')
         return [f"- {content[:MAX_BULLET_LENGTH-3].strip()}..."]
     
     return [bullet]
 
 
-def refine_section(content: str, section_name: str) -> Tuple[str, bool]:
-    """Refine a section by splitting long bullets."""
-    pattern = rf'^## {re.escape(section_name)}$'
-    lines = content.split('\n')
+# split_long_bullet_optimal starts from this split; its own result is what gets cached
+_split_greedy = inspect.unwrap(split_long_bullet)
+
+
+@instrument.timed
+@memo.cached(TRANSFORM_VERSION)
+def split_long_bullet_optimal(bullet: str) -> List[str]:
+    """Split a long bullet at the best set of break points, keeping all of its text.
+
+    Where split_long_bullet splits the bullet at break points into pieces
+    within the bounds, those breaks are kept (with any conjunction it dropped
+    put back). A bullet that cannot be split within MAX_BULLET_LENGTH is
+    returned as is.
+    """
+    bullet = bullet.strip()
+    if not bullet.startswith('- '):
+        return [bullet]
+    content = bullet[2:]
+    pieces = split_at(content, [piece[2:] for piece in _split_greedy(bullet)], MAX_BULLET_LENGTH)
+    if pieces is None:
+        pieces = split_text(content, MAX_BULLET_LENGTH)
+    if pieces is None or len(pieces) == 1:
+        return [bullet]
+    instrument.hit('split_long_bullet_optimal.split')
+    return [f"- {piece}" for piece in pieces]
+
+
+Splitter = Callable[[str], List[str]]
+
+
+def plan_section(doc: LessonDocument, section_name: str,
+                 split: Splitter = split_long_bullet) -> Tuple[List[Tuple[int, List[str]]], bool]:
+    """Plan the bullet splits for a section.
     
+    Returns (edits, modified): edits are (line index, replacement bullets),
+    bottom-up, and modified is True if any bullet was actually split.
+    """
+    edits = []
     modified = False
-    new_lines = []
-    i = 0
     
-    while i < len(lines):
-        line = lines[i]
-        
-        if re.match(pattern, line):
-            new_lines.append(line)
-            i += 1
+    for section in reversed(list(doc.iter_sections([section_name]))):
+        # Process bullets until next section
+        for i in range(section.end - 1, section.start, -1):
+            bullet_line = doc.lines[i].strip()
             
-            # Skip blank line after heading
-            if i < len(lines) and not lines[i].strip():
-                new_lines.append(lines[i])
-                i += 1
-            
-            # Process bullets until next section
-            while i < len(lines) and not lines[i].startswith('##'):
-                bullet_line = lines[i]
-                
-                if bullet_line.strip().startswith('- '):
-                    # Check if bullet is too long
-                    if len(bullet_line.strip()) > MAX_BULLET_LENGTH + 2:  # +2 for '- '
-                        # Split the bullet
-                        split_bullets = split_long_bullet(bullet_line.strip())
-                        for bullet in split_bullets:
-                            new_lines.append(bullet)
-                        if len(split_bullets) > 1:
-                            modified = True
-                    else:
-                        new_lines.append(bullet_line)
-                else:
-                    new_lines.append(bullet_line)
-                
-                i += 1
-        else:
-            new_lines.append(line)
-            i += 1
+            # Check if bullet is too long (+2 for '- ')
+            if len(bullet_line) > MAX_BULLET_LENGTH + 2 and LESSON_RULES.classify(doc.lines[i]) in ANY_BULLETS:
+                # Split the bullet
+                split_bullets = split(bullet_line)
+                edits.append((i, split_bullets))
+                if len(split_bullets) > 1:
+                    modified = True
     
-    return '\n'.join(new_lines), modified
+    return edits, modified
 
 
-def process_file(file_path: Path) -> bool:
-    """Process a file and return True if modified."""
-    try:
-        content = file_path.read_text(encoding='utf-8')
-        original = content
-        
-        # Refine both sections
-        content, modified1 = refine_section(content, "What You'll Learn")
-        content, modified2 = refine_section(content, "Key Takeaways")
-        
-        if (modified1 or modified2) and content != original:
-            file_path.write_text(content, encoding='utf-8')
-            return True
-        
-        return False
+def refine_section(content: str, section_name: str) -> Tuple[str, bool]:
+    """Refine a section by splitting long bullets."""
+    doc = LessonDocument(content)
+    edits, modified = plan_section(doc, section_name)
+    if not edits:
+        return content, False
+    for i, split_bullets in edits:
+        doc.replace(i, i + 1, split_bullets)
+    return doc.text(), modified
+
+
+def transform_document(doc: LessonDocument, split: Splitter = split_long_bullet) -> bool:
+    """Refine both sections in place and return True if a bullet was split."""
+    edits1, modified1 = plan_section(doc, "What You'll Learn", split)
+    edits2, modified2 = plan_section(doc, "Key Takeaways", split)
     
-    except Exception as e:
-        print(f"Error processing {file_path}: {e}")
+    # Only rewrite when something was split; truncating alone is not worth a write
+    if not (modified1 or modified2):
         return False
+    
+    # One replace per section, bottom-up so it never shifts lines we have yet to edit
+    heading_lines = [heading.index for heading in doc.headings]
+    runs = groupby(sorted(edits1 + edits2), key=lambda edit: bisect(heading_lines, edit[0]))
+    for run in reversed([list(run) for _, run in runs]):
+        first, last = run[0][0], run[-1][0]
+        new_lines = []
+        for i, split_bullets in run:
+            new_lines.extend(doc.lines[first:i])
+            new_lines.extend(split_bullets)
+            first = i + 1
+        doc.replace(run[0][0], last + 1, new_lines)
+    return True
+
+
+def transform_document_optimal(doc: LessonDocument) -> bool:
+    """transform_document with split_long_bullet_optimal (the 'refine-optimal' stage)."""
+    return transform_document(doc, split_long_bullet_optimal)
+
+
+def might_change(lesson: prefilter.LessonBytes, split: Splitter = split_long_bullet) -> bool:
+    """Byte-level check: False if no target-section bullet over the limit would be split."""
+    for body in lesson.section_bodies(subsections=False):
+        for line in body:
+            bullet_line = line.strip()
+            if (len(bullet_line) > MAX_BULLET_LENGTH + 2 and LESSON_RULES.classify(line) in ANY_BULLETS
+                    and len(split(bullet_line)) > 1):
+                return True
+    return False
+
+
+def might_change_optimal(lesson: prefilter.LessonBytes) -> bool:
+    return might_change(lesson, split_long_bullet_optimal)
+
+
+def transform_lines(lines: Iterable[str], status: StreamStatus,
+                    split: Splitter = split_long_bullet) -> Iterator[str]:
+    """Streaming form of transform_document.
+    
+    Long bullets are replaced as they stream past. Whether any of them was
+    actually split is only known at the end, so `status.changed` is set only
+    then; if nothing was split the runner discards this output.
+    """
+    for line, rule, section in tag_sections(lines, ["What You'll Learn", "Key Takeaways"], subsections=False):
+        bullet_line = line.strip()
+        if (section is None or rule not in ANY_BULLETS
+                or len(bullet_line) <= MAX_BULLET_LENGTH + 2):
+            yield line
+            continue
+        
+        split_bullets = split(bullet_line)
+        if len(split_bullets) > 1:
+            status.changed = True
+        if split_bullets != [line]:
+            status.rewrote = True
+        yield from split_bullets
+
+
+def transform_lines_optimal(lines: Iterable[str], status: StreamStatus) -> Iterator[str]:
+    return transform_lines(lines, status, split_long_bullet_optimal)
+
+
+def process_file(file_path: Path) -> bool:
+    """Process a file and return True if modified."""
+    result = process_lesson(file_path, [STAGES['refine']])
+    if result.error:
+        print(f"Error processing {file_path}: {result.error}")
+    return result.modified
 
 
 def main():
     """Main function."""
-    files = list(CONTENT_DIR.rglob("*.md"))
-    files = [f for f in files if "_meta" not in str(f) and f.name != "index.md"]
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--optimal', action='store_true',
+        help="choose all the breaks of a bullet together, without truncating or dropping text",
+    )
+    add_runner_arguments(parser)
+    args = parser.parse_args()
+    out = report_stream(args)
+    stage = STAGES['refine-optimal' if args.optimal else 'refine']
+    
+    files = select_files(CONTENT_DIR, LESSONS, args)
     
-    print(f"Found {len(files)} files to process")
+    print(f"Found {len(files)} files to process", file=out)
     
     modified_count = 0
-    for file_path in sorted(files):
-        if process_file(file_path):
+    skipped_count = 0
+    for result in process_files(sorted(files), [stage], args):
+        report_result(result, "Refined", out, errors=out)
+        if result.modified:
             modified_count += 1
-            print(f"Refined: {file_path}")
+        elif result.skipped:
+            skipped_count += 1
     
-    print(f"\nProcessed {len(files)} files, refined {modified_count} files")
+    print(f"\nProcessed {len(files)} files, refined {modified_count} files", file=out)
+    report_summary(args, skipped_count, out)
+
+    watch_and_report(CONTENT_DIR, LESSONS, [stage], args, "Refined", out, errors=out)
 
 
 if __name__ == "__main__":
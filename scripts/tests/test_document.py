@@ -0,0 +1,92 @@
+"""
+Randomized checks of LessonDocument.replace against plain list edits.
+
+  python3 -m unittest discover scripts/tests
+"""
+
+import random
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lesson_tools import document  # noqa: E402
+from lesson_tools.document import LessonDocument  # noqa: E402
+from lesson_tools.runner import render_lesson  # noqa: E402
+
+LINES = ['', '- a bullet', '- Another bullet', 'Some text.', '## Heading', '### Sub', "## What You'll Learn",
+         '> **Quick Summary:** summary', '> more', 'café ✓', '---', '---']
+
+
+def random_lines(rng: random.Random, low: int, high: int):
+    return [rng.choice(LINES) for _ in range(rng.randint(low, high))]
+
+
+def apply(original, edits):
+    """Apply LessonDocument.edits to the original lines."""
+    lines = []
+    position = 0
+    for start, end, new_lines in edits:
+        lines.extend(original[position:start])
+        lines.extend(new_lines)
+        position = end
+    lines.extend(original[position:])
+    return lines
+
+
+class ReplaceTest(unittest.TestCase):
+
+    def check(self, seed: int, replaces: int):
+        rng = random.Random(seed)
+        text = '\n'.join(random_lines(rng, 0, 40))
+        original = text.split('\n')
+        doc = LessonDocument(text)
+        expected = list(original)
+        for _ in range(replaces):
+            start = rng.randint(0, len(expected))
+            end = rng.randint(start, min(len(expected), start + 4))
+            new_lines = random_lines(rng, 0, 4)
+            if rng.random() < 0.3:
+                new_lines = expected[start:end]  # a replace that changes nothing
+            doc.replace(start, end, new_lines)
+            expected[start:end] = new_lines
+
+        self.assertEqual(doc.lines, expected)
+        self.assertEqual(apply(original, doc.edits()), expected)
+        rescanned = LessonDocument('\n'.join(expected))
+        self.assertEqual([(h.index, h.line) for h in doc.headings], [(h.index, h.line) for h in rescanned.headings])
+        self.assertEqual(doc.quick_summary, rescanned.quick_summary)
+        self.assertEqual(doc.frontmatter, rescanned.frontmatter)
+        data = text.encode('utf-8')
+        new_data = render_lesson(data, text, doc)
+        self.assertEqual(new_data if new_data is not None else data, '\n'.join(expected).encode('utf-8'))
+
+    def test_random_replaces(self):
+        for seed in range(500):
+            self.check(seed, random.Random(seed).randint(0, 12))
+
+    def test_merged_pieces(self):
+        # Past MAX_PIECES the pieces between the first and last edit are merged; the result must not change
+        with mock.patch.object(document, 'MAX_PIECES', 4):
+            for seed in range(500):
+                self.check(seed, 30)
+
+    def test_closing_unclosed_frontmatter(self):
+        doc = LessonDocument('---\ntitle: x\n## Heading')
+        self.assertIsNone(doc.frontmatter)
+        doc.replace(2, 2, ['---'])
+        self.assertEqual(doc.frontmatter, (0, 3))
+        self.assertEqual(doc.frontmatter, LessonDocument(doc.text()).frontmatter)
+
+    def test_pieces_stay_bounded(self):
+        doc = LessonDocument('\n'.join(f"- Bullet {i}" for i in range(5000)))
+        for i in range(0, 5000, 2):
+            doc.replace(i, i + 1, [f"- bullet {i}"])
+        self.assertLessEqual(len(doc.pieces), document.MAX_PIECES)
+        self.assertEqual(apply([f"- Bullet {i}" for i in range(5000)], doc.edits()), doc.lines)
+
+
+if __name__ == '__main__':
+    unittest.main()
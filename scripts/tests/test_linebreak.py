@@ -0,0 +1,156 @@
+"""
+The optimal bullet splitter against the greedy one it replaces under refine --optimal.
+
+  python3 -m unittest discover scripts/tests
+"""
+
+import inspect
+import re
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lesson_tools.linebreak import MIN_PIECE_LENGTH, split_at, split_text  # noqa: E402
+from lesson_tools.stages import load_script  # noqa: E402
+from lesson_tools.synthetic import generate_corpus, lesson_files  # noqa: E402
+
+refine = load_script('refine-long-bullets')
+MAX = refine.MAX_BULLET_LENGTH
+greedy = inspect.unwrap(refine.split_long_bullet)
+optimal = inspect.unwrap(refine.split_long_bullet_optimal)
+
+# What split_long_bullet may drop between two of its pieces
+GAP = re.compile(r"\s*;\s*|,\s+|\s+")
+CONJUNCTION = re.compile(r"(?i:and|whilst|while|also|additionally|furthermore|moreover)\s+")
+
+# (bullet, what --optimal splits it into)
+SPLITS = [
+    # The greedy split is clean, so its breaks are kept, with the conjunction it drops put back
+    ("- pattern component feedback prototype; handoff motion colour review pattern; contrast responsive variant",
+     ['- pattern component feedback prototype', '- handoff motion colour review pattern',
+      '- contrast responsive variant']),
+    ("- Optimise shader performance by reducing complexity, limiting texture samples, and controlling update "
+     "frequency",
+     ['- Optimise shader performance by reducing complexity, limiting texture samples',
+      '- and controlling update frequency']),
+    ("- **Damping:** The friction. High damping behaves like moving through water (no bounce); low damping "
+     "behaves like a rubber band (lots of bounce).",
+     ['- **Damping:** The friction. High damping behaves like moving through water (no bounce)',
+      '- low damping behaves like a rubber band (lots of bounce).']),
+    # The greedy split repeats its last piece, so the breaks are chosen afresh
+    ("- Build accessible colour systems that meet contrast requirements, and document every token so the team "
+     "can reuse them",
+     ['- Build accessible colour systems that meet contrast requirements',
+      '- and document every token so the team can reuse them']),
+    # The greedy split drops text
+    ("- Understand how the browser schedules layout, paint and composite work and why animating transform and "
+     "opacity stays on the compositor",
+     ['- Understand how the browser schedules layout, paint and composite work',
+      '- and why animating transform and opacity stays on the compositor']),
+    # The greedy split truncates; only a space is left to break at, outside the parentheses
+    ("- Keep motion purposeful: every transition should explain a change of state (like a panel opening or a "
+     "list reordering) rather than decorate it",
+     ['- Keep motion purposeful: every transition should explain a change of',
+      '- state (like a panel opening or a list reordering) rather than decorate it']),
+    # Short enough, or no break at all within the limit
+    ("- A short bullet", ['- A short bullet']),
+    ("- " + "x" * 120, ["- " + "x" * 120]),
+]
+
+
+def clean_greedy_split(content: str, pieces):
+    """True if the greedy pieces are content cut at break points, each within the bounds."""
+    if len(pieces) < 2 or any(not MIN_PIECE_LENGTH <= len(piece) <= MAX for piece in pieces):
+        return False
+    position = 0
+    for k, piece in enumerate(pieces):
+        if k:
+            gap = GAP.match(content, position)
+            if gap is None or gap.end() == position:
+                return False
+            position = gap.end()
+            if not content.startswith(piece, position):
+                dropped = CONJUNCTION.match(content, position)
+                if dropped is None:
+                    return False
+                position = dropped.end()
+        if not content.startswith(piece, position):
+            return False
+        position += len(piece)
+    return position == len(content)
+
+
+class LinebreakTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        bullets = set()
+        with tempfile.TemporaryDirectory() as tmp:
+            generate_corpus(Path(tmp), 200, seed=5)
+            for path in lesson_files(Path(tmp)):
+                bullets.update(line.strip() for line in path.read_text(encoding='utf-8').split('\n')
+                               if line.startswith('- ') and len(line.strip()) > MAX + 2)
+        cls.bullets = sorted(bullets) + [bullet for bullet, _ in SPLITS]
+
+    def test_table(self):
+        for bullet, expected in SPLITS:
+            with self.subTest(bullet=bullet):
+                self.assertEqual(optimal(bullet), expected)
+
+    def test_matches_clean_greedy_splits(self):
+        matched = 0
+        for bullet in self.bullets:
+            content = bullet[2:]
+            pieces = [piece[2:] for piece in greedy(bullet)]
+            if not clean_greedy_split(content, pieces):
+                continue
+            matched += 1
+            with self.subTest(bullet=bullet):
+                split = [piece[2:] for piece in optimal(bullet)]
+                self.assertEqual(len(split), len(pieces))
+                for ours, theirs in zip(split, pieces):
+                    self.assertTrue(ours == theirs or (ours.endswith(theirs)
+                                                       and CONJUNCTION.fullmatch(ours[:-len(theirs)])), ours)
+        self.assertGreater(matched, 50)
+
+    def test_keeps_all_text(self):
+        for bullet in self.bullets:
+            content = bullet[2:]
+            split = [piece[2:] for piece in optimal(bullet)]
+            with self.subTest(bullet=bullet):
+                if len(split) == 1:
+                    self.assertEqual(split, [content])
+                    continue
+                position = 0
+                for k, piece in enumerate(split):
+                    self.assertTrue(MIN_PIECE_LENGTH <= len(piece) <= MAX, piece)
+                    if k:
+                        gap = GAP.match(content, position)
+                        position = gap.end() if gap else position
+                    self.assertTrue(content.startswith(piece, position), piece)
+                    position += len(piece)
+                self.assertEqual(position, len(content))
+
+    def test_split_text(self):
+        self.assertEqual(split_text("  fits  ", MAX), ["fits"])
+        self.assertIsNone(split_text("x" * 120, MAX))
+        for text in ("word " * 40, "more " * 10 + "(" + "word " * 12 + ") and " + "more " * 10):
+            pieces = split_text(text, MAX)
+            self.assertTrue(all(MIN_PIECE_LENGTH <= len(piece) <= MAX for piece in pieces))
+            self.assertTrue(all(piece.count('(') == piece.count(')') for piece in pieces))
+
+    def test_split_at(self):
+        first, second, third = "the first clause of this bullet", "the second clause of it", "the third clause of it"
+        text = f"{first}; {second}, and {third}"
+        self.assertEqual(split_at(text, [first, second, third], MAX), [first, second, "and " + third])
+        # Not at a break, too short, or with text missing
+        self.assertIsNone(split_at(text, ["the first clause of this", text[len("the first clause of this "):]], MAX))
+        self.assertIsNone(split_at(text, [first, second, third], MAX, min_length=len(second) + 1))
+        self.assertIsNone(split_at(text, [first, third], MAX))
+
+
+if __name__ == '__main__':
+    unittest.main()
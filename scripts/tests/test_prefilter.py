@@ -0,0 +1,82 @@
+"""
+The byte-level prefilter against a full parse: a lesson is skipped exactly when the stages would not change it.
+
+  python3 -m unittest discover scripts/tests
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lesson_tools.document import LessonDocument  # noqa: E402
+from lesson_tools.prefilter import LessonBytes, needs_work  # noqa: E402
+from lesson_tools.runner import decode_lesson, render_lesson, run_stages  # noqa: E402
+from lesson_tools.stages import STAGES, resolve_stages  # noqa: E402
+from lesson_tools.synthetic import generate_corpus, lesson_files  # noqa: E402
+
+LONG = "this bullet runs on well past the limit without a single place where it could be broken apart " * 2
+
+# Edge cases the generated corpus may not reach
+LESSONS = [
+    "",
+    "## What You'll Learn",
+    "## What You'll Learn\n- Already a bullet\n",
+    "## What You'll Learn\nA paragraph. Another sentence here.\n## Next\n",
+    "## What You'll Learn\n- fine\n### Sub\nA paragraph under the subsection.\n",
+    "## Key Takeaways\n- duplicate\n- Duplicate\n",
+    "## Key Takeaways\n  - Indented capital\n",
+    f"## Key Takeaways\n- {LONG}\n",
+    f"## Key Takeaways\n- {LONG}, and then a second clause that is long enough to stand alone\n",
+    "> **Quick Summary:** a summary\n\n## Key Takeaways\n- fine\n",
+    "## What You'll Learnt\nNot a target heading.\n",
+    "Text ## What You'll Learn\nNot a heading either.\n",
+]
+
+
+def variants(data: bytes):
+    """The lesson with each of the newline styles decode_lesson accepts."""
+    return data, data.replace(b'\n', b'\r\n'), data.replace(b'\n', b'\r')
+
+
+def full_parse_changes(data: bytes, stages) -> bool:
+    content = decode_lesson(data)
+    doc = LessonDocument(content)
+    return bool(run_stages(doc, stages)) and render_lesson(data, content, doc) is not None
+
+
+class PrefilterTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with tempfile.TemporaryDirectory() as tmp:
+            generate_corpus(Path(tmp), 150, seed=3)
+            corpus = [path.read_bytes() for path in lesson_files(Path(tmp))]
+        cls.lessons = [data for lesson in corpus + [text.encode('utf-8') for text in LESSONS]
+                       for data in variants(lesson)]
+
+    def test_each_stage(self):
+        for name, stage in STAGES.items():
+            for data in self.lessons:
+                content = decode_lesson(data)
+                with self.subTest(stage=name, lesson=content[:80]):
+                    self.assertEqual(stage.might_change(LessonBytes(data)), stage.apply(LessonDocument(content)))
+
+    def test_pipelines(self):
+        for names in (['convert', 'refine', 'case'], ['convert', 'refine-optimal', 'lowercase'], ['case']):
+            stages = resolve_stages(names)
+            for data in self.lessons:
+                with self.subTest(stages=names, lesson=data[:80]):
+                    self.assertEqual(needs_work(data, stages), full_parse_changes(data, stages))
+
+    def test_invalid_utf8_is_not_skipped(self):
+        stages = resolve_stages(['case'])
+        self.assertFalse(needs_work(b"## Key Takeaways\n- Fine\n", stages))
+        self.assertTrue(needs_work(b"## Other\n\xff\n", stages))
+        self.assertTrue(needs_work(b"## Key Takeaways\n- \xff\n", stages))
+
+
+if __name__ == '__main__':
+    unittest.main()
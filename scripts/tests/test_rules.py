@@ -0,0 +1,51 @@
+"""
+The lesson rule table: line classification and whole-text scans.
+
+  python3 -m unittest discover scripts/tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lesson_tools.rules import ANY_BULLETS, BULLETS, HEADING_RULES, LESSON_RULES  # noqa: E402
+
+LINES = ['', ' ', '\t', '- b', '- B', '-', '- ', '  - b', '\t- b', '\xa0- b', '  -b', ' ## x', '## x', '### x',
+         "## What You'll Learn", "## Key Takeaways", '---', '--- ', 'text', '> **Quick Summary:** s', '- > **Quick Summary:**']
+
+
+class RulesTest(unittest.TestCase):
+
+    def test_bullets_match_strip(self):
+        for line in LINES:
+            with self.subTest(line=line):
+                rule = LESSON_RULES.classify(line)
+                self.assertEqual(rule in BULLETS, line.startswith('- '))
+                self.assertEqual(rule in ANY_BULLETS, line.strip().startswith('- ') or line == '- ')
+
+    def test_scan_blank_lines_and_indented_bullets(self):
+        text = 'a\n\n- b\n  - c\n\t- d\n\n## x\n'
+        self.assertEqual(LESSON_RULES.scan(text),
+                         [(2, 'bullet'), (3, 'indented_bullet'), (4, 'indented_bullet'), (6, 'heading')])
+        self.assertEqual(LESSON_RULES.scan('a\n\n- b\n- c\n'), [(2, 'bullet'), (3, 'bullet')])
+
+    def test_scan_matches_classify(self):
+        # Markers are reported alongside the rules by scan, so compare the rules alone
+        rules = LESSON_RULES.only(*(rule.name for rule in LESSON_RULES.rules))
+        for first in LINES:
+            for second in LINES:
+                text = '\n'.join([first, '', second, second])
+                expected = [(i, rules.classify(line)) for i, line in enumerate(text.split('\n'))
+                            if rules.classify(line) is not None]
+                with self.subTest(text=text):
+                    self.assertEqual(rules.scan(text), expected)
+
+    def test_headings(self):
+        text = "intro\n## What You'll Learn\n- a\n### Sub\n#### Deep\n ## not\n"
+        self.assertEqual([index for index, _ in HEADING_RULES.scan(text)], [1, 3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
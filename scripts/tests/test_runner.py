@@ -0,0 +1,57 @@
+"""
+End-to-end runs of the content scripts over a small synthetic corpus.
+
+  python3 -m unittest discover scripts/tests
+"""
+
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SCRIPTS = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS))
+
+from lesson_tools.synthetic import generate_corpus, lesson_files  # noqa: E402
+
+CONTENT_DIR = Path('content/course')
+
+
+def run_script(cwd: Path, script: str, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, str(SCRIPTS / f'{script}.py'), *args],
+                          cwd=cwd, capture_output=True, text=True)
+
+
+def snapshot(root: Path) -> dict:
+    """Every file under root, relative path -> bytes."""
+    return {path.relative_to(root): path.read_bytes() for path in sorted(root.rglob('*')) if path.is_file()}
+
+
+class RunnerTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        generate_corpus(self.root / CONTENT_DIR, 24, seed=1)
+
+    def test_prefetch_report(self):
+        expected = self.root / 'expected'
+        (expected / CONTENT_DIR).parent.mkdir(parents=True)
+        generate_corpus(expected / CONTENT_DIR, 24, seed=1)
+        self.assertEqual(run_script(expected, 'normalize-lessons').returncode, 0)
+
+        run = run_script(self.root, 'normalize-lessons', '--prefetch', '4', '--report', 'report.json')
+        self.assertEqual(run.returncode, 0, run.stderr)
+        self.assertIn("Time by function:", run.stdout + run.stderr)
+        totals = json.loads((self.root / 'report.json').read_text())['totals']
+        for name in ('read', 'write'):
+            self.assertIn(name, totals['timings'])
+            self.assertGreater(totals['calls'][name], 0)
+        self.assertEqual(snapshot(self.root / CONTENT_DIR), snapshot(expected / CONTENT_DIR))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+The bullet splitters pinned to the original scripts' output.
+
+Each table pairs an input with what the original convert-bullet-lists.py
+(paragraph_to_bullets) or refine-long-bullets.py (split_long_bullet) returned
+for it; between them the inputs take every branch of both.
+
+  python3 -m unittest discover scripts/tests
+"""
+
+import inspect
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lesson_tools.segmenter import paragraph_to_bullets  # noqa: E402
+from lesson_tools.stages import load_script  # noqa: E402
+
+PARAGRAPHS = [
+    ('Design tokens keep colour and spacing consistent. They are shared between design files and code. Short one.',
+     ['Design tokens keep colour and spacing consistent', 'They are shared between design files and code']),
+    ('You will learn how layout grids work in practice. And you will practise building responsive components for '
+     'the web.',
+     ['You will learn how layout grids work in practice',
+      'You will practise building responsive components for the web']),
+    ('Understand how motion guides attention, Reviewing prototypes with engineers early, Shipping components that '
+     'scale across platforms.',
+     ['Understand how motion guides attention',
+      'Reviewing prototypes with engineers early',
+      'Shipping components that scale across platforms']),
+    ('Learn to build accessible navigation patterns that work with screen readers and keyboard users while '
+     'keeping the visual hierarchy clear and consistent.',
+     ['Learn to build accessible navigation patterns that work with screen readers',
+      'And  keyboard users while  keeping the visual hierarchy clear']),
+    ('This sentence is extremely long and keeps going without any conjunction to split it on because the author '
+     'wanted to test truncation behaviour in the segmenter thoroughly indeed.',
+     ['This sentence is extremely long and']),
+    ('Tokens. Grids. Type.', ['Tokens. Grids. Type.']),
+    ('no sentence boundary here just a run of lowercase words describing the lesson content in some detail for '
+     'the reader to enjoy',
+     ['No sentence boundary here just a run of lowercase words describing the lesson content in some detail for '
+      'the reader..']),
+    ('First sentence about design systems here. Second sentence about component libraries. Third sentence about '
+     'tokens and themes. Fourth sentence about motion design. Fifth sentence about accessibility. Sixth sentence '
+     'about typography scales. Seventh sentence about handoff. Eighth sentence about reviews.',
+     ['First sentence about design systems here',
+      'Second sentence about component libraries',
+      'Third sentence about tokens and themes',
+      'Fourth sentence about motion design',
+      'Fifth sentence about accessibility',
+      'Sixth sentence about typography scales',
+      'Seventh sentence about handoff']),
+    ('Moreover, the course covers interaction feedback in depth. However, it also explains gesture navigation on '
+     'mobile platforms!',
+     ['The course covers interaction feedback in depth',
+      'It also explains gesture navigation on mobile platforms!']),
+    ('Why does contrast matter? Because hierarchy depends on it, Building interfaces that communicate clearly to '
+     'every user.',
+     ['Why does contrast matter',
+      'Because hierarchy depends on it, Building interfaces that communicate clearly to every user']),
+    ('  Whitespace   is\tnormalized   before   splitting sentences.   Another    sentence follows here.  ',
+     ['Whitespace is normalized before splitting sentences', 'Another sentence follows here']),
+    ('You will explore rendering performance, Designing layouts that adapt to constraints, and Reviewing the '
+     'workflow with the library team regularly, Testing variants along the way to be sure everything works.',
+     ['You will explore rendering performance', 'Testing variants along the way to be sure everything works']),
+    ('Learn how design engineers bridge the gap between design and code, whilst also understanding the '
+     'constraints of each platform and the needs of the people who use them every day.',
+     ['Learn how design engineers bridge the gap between design',
+      'And  code, whilst  also understanding the constraints of each platform',
+      'And  the needs of the people who use them every day']),
+    ('', ['']),
+    ('A.', ['A.']),
+]
+
+LONG_BULLETS = [
+    ('- Short bullet that needs no split', ['- Short bullet that needs no split']),
+    ('- Learn how design engineers bridge the gap between design and code, and understand the constraints of each '
+     'platform deeply',
+     ['- Learn how design engineers bridge the gap between design and code',
+      '- understand the constraints of each platform deeply',
+      '- understand the constraints of each platform deeply']),
+    ('- Design tokens keep colour consistent across products; grids keep layouts aligned everywhere; type scales '
+     'keep reading comfortable',
+     ['- Design tokens keep colour consistent across products',
+      '- grids keep layouts aligned everywhere',
+      '- type scales keep reading comfortable']),
+    ('- Build responsive layouts with grids and tokens while keeping the visual hierarchy clear and the '
+     'interaction feedback consistent across platforms',
+     ['- Build responsive layouts with grids and tokens while keeping the visual hierarchy clear',
+      '- the interaction feedback consistent across platforms',
+      '- the interaction feedback consistent across platforms']),
+    ('- Tokens define colour spacing type motion elevation radius, leaving engineers free to build every product '
+     'the team ships with confidence today',
+     ['- Tokens define colour spacing type motion elevation radius,']),
+    ('- word word word word word word word word word word word word word word word word word word word word word '
+     'word word word word word word word word word word word word word word word word word word word ',
+     ['- word word word word word word word word word word word word word word word word word word word wo...']),
+    ('- Understand accessibility, whilst also learning motion, moreover practising typography scales and colour '
+     'contrast checks in real projects',
+     ['- Understand accessibility, whilst also learning motion',
+      '- practising typography scales and colour contrast checks in real projects',
+      '- practising typography scales and colour contrast checks in real projects']),
+    ('- Prototype quickly and review often and ship carefully and measure impact and iterate on feedback from '
+     'users and stakeholders alike',
+     ['- Prototype quickly and review often and ship carefully and measure impact',
+      '- iterate on feedback from users iterate on feedback from users and stakeholders alike']),
+    ('- Averyveryverylongwordwithoutanyspaces- Averyveryverylongwordwithoutanyspaces- '
+     'Averyveryverylongwordwithoutanyspaces- Averyveryverylongwordwithoutanyspaces',
+     ['- Averyveryverylongwordwithoutanyspaces- Averyveryverylongwordwithoutanyspaces- Averyveryverylongwo...']),
+]
+
+
+class SplitterTest(unittest.TestCase):
+
+    def test_paragraph_to_bullets(self):
+        convert = load_script('convert-bullet-lists')
+        for paragraph, expected in PARAGRAPHS:
+            with self.subTest(paragraph=paragraph):
+                self.assertEqual(paragraph_to_bullets(paragraph), expected)
+                self.assertEqual(convert.paragraph_to_bullets(paragraph), expected)
+
+    def test_split_long_bullet(self):
+        # Unwrapped, so every case runs the splitter rather than the cache
+        split_long_bullet = inspect.unwrap(load_script('refine-long-bullets').split_long_bullet)
+        for bullet, expected in LONG_BULLETS:
+            with self.subTest(bullet=bullet):
+                self.assertEqual(split_long_bullet(bullet), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+--transaction: rewrites committed together, or rolled back leaving the tree as it was.
+
+  python3 -m unittest discover scripts/tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lesson_tools import transaction  # noqa: E402
+from lesson_tools.synthetic import generate_corpus  # noqa: E402
+from lesson_tools.transaction import Transaction, TransactionError, stage_write  # noqa: E402
+from test_runner import CONTENT_DIR, run_script, snapshot  # noqa: E402
+
+
+class TransactionTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        self.paths = []
+        for i in range(3):
+            path = self.root / f"lesson-{i}.md"
+            path.write_text(f"old {i}\n")
+            self.paths.append(path)
+
+    def stage_all(self) -> Transaction:
+        staged = Transaction()
+        for i, path in enumerate(self.paths):
+            staged.add(stage_write(path, f"new {i}\n".encode(), path.stat()))
+        return staged
+
+    def assert_unchanged(self, before: dict):
+        self.assertEqual(snapshot(self.root), before)
+
+    def test_commit(self):
+        staged = self.stage_all()
+        staged.commit()
+        self.assertTrue(staged.committed)
+        self.assertEqual(snapshot(self.root), {path.relative_to(self.root): f"new {i}\n".encode()
+                                               for i, path in enumerate(self.paths)})
+
+    def test_rollback(self):
+        before = snapshot(self.root)
+        staged = self.stage_all()
+        staged.rollback()
+        self.assert_unchanged(before)
+
+    def test_saved_again_before_commit(self):
+        before = snapshot(self.root)
+        staged = self.stage_all()
+        stat = self.paths[1].stat()
+        os.utime(self.paths[1], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        with self.assertRaises(TransactionError):
+            staged.commit()
+        self.assertFalse(staged.committed)
+        self.assert_unchanged(before)
+
+    def test_failure_part_way_through_commit(self):
+        before = snapshot(self.root)
+        staged = self.stage_all()
+        replace = os.replace
+        calls = []
+
+        def fail_second(src, dst):
+            calls.append(dst)
+            if len(calls) == 2:
+                raise OSError("disk full")
+            replace(src, dst)
+
+        with mock.patch.object(transaction.os, 'replace', side_effect=fail_second):
+            with self.assertRaises(TransactionError):
+                staged.commit()
+        self.assert_unchanged(before)
+
+
+class TransactionRunTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        generate_corpus(self.root / CONTENT_DIR, 24, seed=2)
+
+    def test_failed_file_rolls_back_the_run(self):
+        # Sorted into the middle of the run, after rewrites have been staged
+        lessons = sorted((self.root / CONTENT_DIR).rglob('*.md'))
+        bad = lessons[len(lessons) // 2].with_name('00-bad.md')
+        bad.write_bytes(b"## Key Takeaways\n\n- \xff not UTF-8\n")
+        before = snapshot(self.root)
+
+        run = run_script(self.root, 'normalize-lessons', '--transaction')
+        self.assertNotEqual(run.returncode, 0)
+        self.assertIn("Rolled back", run.stderr)
+        self.assertIn(f"Error processing {bad.relative_to(self.root)}", run.stderr)
+        self.assertNotIn("Modified:", run.stdout)
+        self.assertEqual(snapshot(self.root), before)
+        self.assertEqual([path for path in self.root.rglob('*') if path.suffix == '.tmp'], [])
+
+    def test_commit_matches_a_plain_run(self):
+        expected = self.root / 'expected'
+        generate_corpus(expected / CONTENT_DIR, 24, seed=2)
+        plain = run_script(expected, 'normalize-lessons')
+
+        run = run_script(self.root, 'normalize-lessons', '--transaction')
+        self.assertEqual(run.returncode, 0, run.stderr)
+        self.assertIn("Committed", run.stdout)
+        self.assertEqual(sorted(line for line in run.stdout.splitlines() if line.startswith('Modified:')),
+                         sorted(line for line in plain.stdout.splitlines() if line.startswith('Modified:')))
+        self.assertEqual(snapshot(self.root / CONTENT_DIR), snapshot(expected / CONTENT_DIR))
+        self.assertEqual([path for path in self.root.rglob('*') if path.suffix == '.tmp'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()